@@ -0,0 +1,240 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import aiohttp
+
+from rate_limiter import AFLTABLES_LIMITER, backoff_delay, parse_retry_after
+
+
+class ResponseCache:
+    """
+    On-disk cache of fetched pages and their validators, one entry per url.
+
+    Each entry keeps the ETag / Last-Modified headers for conditional requests,
+    the sha256 of the body, and the hash that was last processed successfully,
+    so a page is only reported as changed until it has been handled once.
+    processed_version is stored with that hash, so changing it (the scraper
+    passes WIKI_MARKUP_VERSION) reports every page as changed again.
+    """
+
+    def __init__(self, directory=os.path.join("player_data", "http_cache"), processed_version=None):
+        self.directory = directory
+        self.processed_version = processed_version
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, key + ".json"), os.path.join(self.directory, key + ".html")
+
+    def _write(self, path, content):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def load(self, url):
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def read_body(self, url):
+        _, body_path = self._paths(url)
+        try:
+            with open(body_path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, body, etag=None, last_modified=None):
+        meta_path, body_path = self._paths(url)
+        previous = self.load(url) or {}
+        entry = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "sha256": hashlib.sha256(body.encode("utf-8")).hexdigest(),
+            "processed_hash": previous.get("processed_hash")
+        }
+        if entry["sha256"] != previous.get("sha256"):
+            self._write(body_path, body)
+        self._write(meta_path, json.dumps(entry))
+        return entry
+
+    def _processed_marker(self, sha256):
+        if self.processed_version is None:
+            return sha256
+        return f"{sha256}:{self.processed_version}"
+
+    def is_changed(self, entry):
+        """False if entry's body was processed successfully under the current processed_version."""
+        return entry.get("processed_hash") != self._processed_marker(entry["sha256"])
+
+    def mark_processed(self, url, sha256=None):
+        """Records the cached copy (or the copy with hash sha256) as successfully processed."""
+        entry = self.load(url)
+        if entry is None:
+            return
+        entry["processed_hash"] = self._processed_marker(sha256 or entry["sha256"])
+        meta_path, _ = self._paths(url)
+        self._write(meta_path, json.dumps(entry))
+
+
+class FetchEngine:
+    """
+    Asyncio fetch engine for afltables.com pages.
+
+    Runs its own event loop in a background thread so the existing worker
+    threads can keep calling a blocking fetch(), while all requests share one
+    keep-alive connection pool capped per host.
+    """
+
+    def __init__(self, per_host_limit=16, max_connections=200, timeout=30, keepalive_timeout=60, cache=None,
+                 limiter=AFLTABLES_LIMITER):
+        self.per_host_limit = per_host_limit
+        self.cache = cache
+        self.limiter = limiter
+        self.throttled_responses = 0
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.loop = None
+        self.thread = None
+        self.session = None
+        self.pending = {}
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        if self.loop is not None:
+            return self
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="fetch-engine", daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self._open_session(), self.loop).result()
+        logging.info(f"Fetch engine started ({self.per_host_limit} connections per host)")
+        return self
+
+    async def _open_session(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_connections,
+            limit_per_host=self.per_host_limit,
+            keepalive_timeout=self.keepalive_timeout
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            # Per-socket timeouts only: a request queued behind the per-host
+            # cap must not time out while it is still waiting for a connection.
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.timeout, sock_read=self.timeout)
+        )
+
+    async def _fetch(self, url):
+        """Returns (text, changed); changed is False when the cache says nothing new."""
+        entry = self.cache.load(url) if self.cache else None
+        headers = self.cache.conditional_headers(entry) if entry else {}
+        try:
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+            async with self.session.get(url, headers=headers) as response:
+                if response.status in (429, 503) and self.limiter is not None:
+                    self.throttled_responses += 1
+                    delay = parse_retry_after(
+                        response.headers.get("Retry-After"),
+                        default=backoff_delay(min(self.throttled_responses, 6))
+                    )
+                    self.limiter.pause(delay, f"(HTTP {response.status})")
+                elif response.status < 400:
+                    self.throttled_responses = 0
+                if response.status == 304 and entry is not None:
+                    body = self.cache.read_body(url)
+                    if body is not None:
+                        return body, self.cache.is_changed(entry)
+                response.raise_for_status()
+                body = await response.text()
+                if self.cache is None:
+                    return body, True
+                entry = self.cache.store(
+                    url, body,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified")
+                )
+                return body, self.cache.is_changed(entry)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logging.error(f"Error fetching URL {url}: {e}")
+            return None, True
+
+    def submit(self, url):
+        """Schedule a fetch and return a concurrent.futures.Future for (text, changed)."""
+        if self.loop is None:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self._fetch(url), self.loop)
+
+    def prefetch(self, urls):
+        """Put every url in flight now; fetch() later picks up the result."""
+        with self.lock:
+            for url in urls:
+                if url not in self.pending:
+                    self.pending[url] = self.submit(url)
+        # Debug level: discovery prefetches one profile at a time
+        logging.debug(f"Prefetching {len(self.pending)} pages")
+
+    def fetch_with_status(self, url, timeout=None):
+        """
+        Blocking fetch for worker threads. Returns (text, changed), where changed
+        is False if the page is identical to the last successfully processed copy.
+        """
+        with self.lock:
+            future = self.pending.pop(url, None)
+        if future is None:
+            future = self.submit(url)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            logging.error(f"Timed out waiting for {url}")
+            return None, True
+
+    def fetch(self, url, timeout=None):
+        """Blocking fetch for worker threads. Returns the page text or None."""
+        return self.fetch_with_status(url, timeout)[0]
+
+    def mark_processed(self, url):
+        if self.cache is not None:
+            self.cache.mark_processed(url)
+
+    def close(self):
+        if self.loop is None:
+            return
+        with self.lock:
+            for future in self.pending.values():
+                future.cancel()
+            self.pending.clear()
+        asyncio.run_coroutine_threadsafe(self.session.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.loop = None
+        self.session = None
@@ -1,18 +1,45 @@
+import argparse
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+from bs4 import BeautifulSoup, SoupStrainer
+from dotenv import load_dotenv
 import json
+import hashlib
 import time
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import schedule
 import sys
-import concurrent.futures
-import threading
-from queue import Queue
 from wikipedia_updater import *
+from afl_fetcher import FetchEngine, ResponseCache
+from player_state import PlayerTracker, TitleCache
+from player_model import STAT_COLUMNS, PlayerStats
+from pipeline import Pipeline
+from rate_limiter import AFLTABLES_LIMITER, WIKI_EDIT_LIMITER, backoff_delay
+from dry_run import DryRun, DryRunFetcher, write_diff_index, write_page_diff
+from page_archive import DEFAULT_ARCHIVE_DIR, PageArchive, read_object
+from metrics import METRICS
+from cpu_pool import CpuPool, run_cpu
+from daemon import ChangeTriggeredScheduler, load_daemon_config, parse_quiet_hours
+try:
+    from fast_parser import extract_profile_tables_lxml, iter_index_rows_lxml
+    PARSER_BACKEND = "lxml"
+except ImportError:
+    PARSER_BACKEND = "bs4"
 import logging
 
+# Where each run leaves metrics.prom and run_summary.json
+METRICS_DIR = "player_data"
+
+# First season on AFL Tables
+FIRST_SEASON = 1897
+
+# Season indexes live at <STATS_BASE_URL><year>.html
+STATS_BASE_URL = "https://afltables.com/afl/stats/"
+
+# Season index columns that decide whether a player's profile needs fetching
+# again in incremental runs: every season total the Statistics table renders
+INDEX_TOTAL_COLUMNS = STAT_COLUMNS + ("BR",)
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -23,129 +50,207 @@ logging.basicConfig(
     ]
 )
 
-class PlayerTracker:
-    def __init__(self):
-        self.tracker_file = "player_tracker.json"
-        self.processed_file = "processed_players.json"
-        self.failed_file = "failed.csv"  # New file for failed players
-        self.lock = threading.Lock()
-        self.load_tracker()
-        
-    def load_tracker(self):
+def _record_failed_attempt(player_name, tracker, attempt, max_retries, error):
+    logging.warning(f"Attempt {attempt + 1} failed for {player_name}: {str(error)}")
+    tracker.record_attempt(player_name, str(error))
+    
+    if attempt == max_retries - 1:
+        logging.error(f"All attempts failed for {player_name}")
+        METRICS.count("failed")
+        tracker.add_failed_player(player_name, str(error))
+        return
+    
+    METRICS.count("retried")
+    # Upstream pacing is left to the shared rate limiters; this only spreads out retries
+    time.sleep(backoff_delay(attempt))
+
+def _mark_player_done(player, tracker, fetcher=None):
+    """Records a player as handled, along with the profile it was handled with."""
+    if fetcher is not None:
+        fetcher.mark_processed(player['Profile Link'])
+    tracker.add_processed_player(player['Player Name'])
+
+def parse_profile_payload(html_content, url=None):
+    """
+    CPU-bound part of scrape_player, run in a CpuPool worker when one is
+    given: (json_output, dob, fingerprint) for a profile page, or None.
+    """
+    player_stats = parse_player_stats(html_content, url)
+    if player_stats is None:
+        return None
+    json_output = player_stats.to_json()
+    return json_output, player_stats.dob, compute_stats_fingerprint(json_output)
+
+def scrape_player(player, tracker, max_retries=4, fetcher=None, preloader=None, cpu_pool=None, archive=None,
+                  incremental=True):
+    """
+    Scrape stage: fetch and parse the profile. Returns the payload for
+    publish_player, None when the player is skipped as unchanged, or False
+    once every attempt has failed.
+    Without incremental, an unchanged profile or stats fingerprint doesn't
+    skip the player, so their page is merged again.
+    """
+    player_name = player['Player Name']
+    
+    for attempt in range(max_retries):
         try:
-            if os.path.exists(self.tracker_file):
-                with open(self.tracker_file, 'r') as f:
-                    self.tracker = json.load(f)
-            else:
-                self.tracker = {"total_players": 0, "processed_count": 0}
-                
-            if os.path.exists(self.processed_file):
-                with open(self.processed_file, 'r') as f:
-                    self.processed_players = json.load(f)
-            else:
-                self.processed_players = []
-                
-            # Initialize failed players tracking
-            if os.path.exists(self.failed_file):
-                self.failed_players = pd.read_csv(self.failed_file)['Player Name'].tolist()
-            else:
-                self.failed_players = []
-                pd.DataFrame(columns=['Player Name']).to_csv(self.failed_file, index=False)
-                
-        except Exception as e:
-            logging.error(f"Error loading tracker files: {str(e)}")
-            self.tracker = {"total_players": 0, "processed_count": 0}
-            self.processed_players = []
-            self.failed_players = []
+            logging.info(f"Scraping {player_name}... (Attempt {attempt + 1}/{max_retries})")
             
-    def save_tracker(self):
-        try:
-            with open(self.tracker_file, 'w') as f:
-                json.dump(self.tracker, f)
-        except Exception as e:
-            logging.error(f"Error saving tracker file: {str(e)}")
+            with METRICS.timer("fetch"):
+                if fetcher is not None:
+                    html_content, changed = fetcher.fetch_with_status(player['Profile Link'])
+                else:
+                    html_content, changed = fetch_page(player['Profile Link']), True
+            if html_content is None:
+                raise Exception("Failed to fetch profile page")
+            METRICS.count("fetched")
+            if archive is not None:
+                archive.put("profile", player['Profile Link'], html_content)
             
-    def save_processed_players(self):
-        try:
-            with open(self.processed_file, 'w') as f:
-                json.dump(self.processed_players, f)
-        except Exception as e:
-            logging.error(f"Error saving processed players file: {str(e)}")
+            if not changed and incremental:
+                logging.info(f"{player_name}'s profile is unchanged since the last run - skipping")
+                METRICS.count("skipped")
+                if preloader is not None:
+                    preloader.discard(player_name)
+                _mark_player_done(player, tracker)
+                return None
+            
+            with METRICS.timer("parse"):
+                parsed = run_cpu(cpu_pool, parse_profile_payload, html_content, player['Profile Link'])
+            if parsed is None:
+                raise Exception("Failed to extract data")
+            json_output, dob, fingerprint = parsed
             
-    def reset_tracker(self):
-        with self.lock:
-            self.tracker["processed_count"] = 0
-            self.processed_players = []
-            self.save_tracker()
-            self.save_processed_players()
-
-    def add_processed_player(self, player_name):
-        if player_name in self.processed_players:
-            return
+            if incremental and tracker.get_fingerprint(player_name) == fingerprint:
+                logging.info(f"Stats for {player_name} unchanged since the last edit - skipping Wikipedia update")
+                METRICS.count("skipped")
+                if preloader is not None:
+                    preloader.discard(player_name)
+                _mark_player_done(player, tracker, fetcher)
+                return None
             
-        with self.lock:
-            if player_name not in self.processed_players:
-                self.processed_players.append(player_name)
-                self.tracker["processed_count"] += 1
-        
-        self.save_processed_players()
-        self.save_tracker()
-
-    def add_failed_player(self, player_name):
-        with self.lock:
-            if player_name not in self.failed_players:
-                self.failed_players.append(player_name)
-                pd.DataFrame({'Player Name': [player_name]}).to_csv(
-                    self.failed_file, 
-                    mode='a', 
-                    header=False, 
-                    index=False
-                )
-                logging.error(f"Added {player_name} to failed players list after multiple retries")
-
-def process_player(player, tracker, wiki_site, max_retries=4):
+            return {
+                "player": player,
+                "json_output": json_output,
+                "dob": dob,
+                "fingerprint": fingerprint
+            }
+            
+        except Exception as e:
+            _record_failed_attempt(player_name, tracker, attempt, max_retries, e)
+    return False
+
+def publish_player(payload, tracker, wiki_site, max_retries=4, fetcher=None, preloader=None,
+                   edit_limiter=WIKI_EDIT_LIMITER, cpu_pool=None, archive=None):
+    """Wiki stage: merge the scraped stats into the player's Wikipedia page. None if they have no article."""
+    player = payload['player']
     player_name = player['Player Name']
     
     for attempt in range(max_retries):
         try:
-            logging.info(f"Processing {player_name}... (Attempt {attempt + 1}/{max_retries})")
-            
-            # Add timeout to requests
-            stats_df, averages_df, dob = extract_tables_data(player['Profile Link'])
-            if stats_df is None or averages_df is None:
-                raise Exception("Failed to extract data")
-                
-            stats_df, total_career_df, votes_df, averages_df = process_player_stats(stats_df, averages_df)
-            if stats_df is None or averages_df is None:
-                raise Exception("Failed to process stats")
-                
-            json_output = convert_dataframes_to_json(stats_df, total_career_df, votes_df, averages_df)
-            success = update_wikipedia_page(player_name, json_output, wiki_site, dob)
-            
-            if success:
-                tracker.add_processed_player(player_name)
-                logging.info(f"Successfully processed {player_name}")
-                return True
-            else:
+            with METRICS.timer("publish"):
+                success = update_wikipedia_page(player_name, payload['json_output'], wiki_site, payload['dob'],
+                                                preloader, edit_limiter, cpu_pool, archive)
+            if success is None:
+                # Not a failure: the title cache finds the article once one is written
+                logging.info(f"{player_name} has no Wikipedia article - nothing to update")
+                METRICS.count("no_article")
+                return None
+            if not success:
                 raise Exception("Failed to update Wikipedia page")
             
-        except Exception as e:
-            logging.warning(f"Attempt {attempt + 1} failed for {player_name}: {str(e)}")
-            time.sleep(5)  # Wait between retries
+            tracker.set_fingerprint(player_name, payload['fingerprint'])
+            _mark_player_done(player, tracker, fetcher)
+            logging.info(f"Successfully processed {player_name}")
+            return True
             
-            if attempt == max_retries - 1:
-                logging.error(f"All attempts failed for {player_name}")
-                tracker.add_failed_player(player_name)
-                return False
-                
-        finally:
-            time.sleep(3)  # Rate limiting between attempts
+        except Exception as e:
+            _record_failed_attempt(player_name, tracker, attempt, max_retries, e)
+    return False
 
-def process_players_thread(players_chunk, tracker, wiki_site):
-    for player in players_chunk:
-        process_player(player, tracker, wiki_site)
+def fetch_page(url, timeout=30, fetcher=None):
+    if fetcher is not None:
+        return fetcher.fetch(url)
+    try:
+        AFLTABLES_LIMITER.acquire()
+        response = requests.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+    except requests.RequestException as e:
+        logging.error(f"Error fetching URL {url}: {e}")
+        return None
+
+def extract_tables_data(url, timeout=30, fetcher=None):
+    html_content = fetch_page(url, timeout, fetcher)
+    if html_content is None:
+        return None, None, None
+    return parse_player_page(html_content, url)
+
+def extract_profile(html_content, backend=None):
+    if (backend or PARSER_BACKEND) == "lxml":
+        return extract_profile_tables_lxml(html_content)
+    return extract_profile_tables(html_content)
+
+def parse_player_stats(html_content, url=None, backend=None):
+    """Parses a profile page straight into a PlayerStats model, or None on failure."""
+    try:
+        tabs, dob = extract_profile(html_content, backend)
+        return PlayerStats.from_tabs(tabs, dob)
+    except Exception as e:
+        logging.error(f"Error parsing HTML from {url}: {str(e)}")
+        return None
 
-def extract_tables_data(url, timeout=30):
+def parse_player_page(html_content, url=None, backend=None):
+    try:
+        tabs, dob = extract_profile(html_content, backend)
+        dataframes = [build_tab_dataframe(headers, rows, footer_rows) for headers, rows, footer_rows in tabs]
+        return tuple(dataframes) + (dob,) if dataframes else (None, None, None)
+    except Exception as e:
+        logging.error(f"Error parsing HTML from {url}: {str(e)}")
+        return None, None, None
+
+def extract_profile_tables(html_content):
+    """
+    BeautifulSoup backend: returns ([(headers, rows, footer_rows), ...], dob)
+    for every simpleTabsContent table on a player profile page.
+    """
+    soup = BeautifulSoup(html_content, 'html.parser')
+    tabs_content = soup.find_all('div', class_='simpleTabsContent')
+    tabs = []
+    
+    for tab_content in tabs_content:
+        table = tab_content.find('table', {'class': 'sortable'})
+        if table:
+            headers = []
+            for th in table.find('thead').find_all('th'):
+                header = th.find('a')
+                headers.append(header.text if header else th.text.strip())
+            
+            rows = []
+            tbody = table.find('tbody')
+            if tbody:
+                for tr in tbody.find_all('tr'):
+                    row = []
+                    for td in tr.find_all('td'):
+                        cell = td.find('a')
+                        row.append(cell.text if cell else td.text.strip())
+                    rows.append(row)
+            
+            footer_rows = []
+            tfoot = table.find('tfoot')
+            if tfoot:
+                for tr in tfoot.find_all('tr'):
+                    footer_row = []
+                    for td in tr.find_all('td'):
+                        footer_row.append(td.text.strip())
+                    footer_rows.append(footer_row)
+            
+            tabs.append((headers, rows, footer_rows))
+    
+    dob = get_player_dob(soup) if tabs else None
+    return tabs, dob
+
+def build_tab_dataframe(headers, rows, footer_rows):
     website_columns_mapping = {
         "Year": "Season",
         "Team": "Team",
@@ -161,70 +266,25 @@ def extract_tables_data(url, timeout=30):
         "BR": "Votes"
     }
     
-    try:
-        response = requests.get(url, timeout=timeout)
-        response.raise_for_status()
-        html_content = response.text
-    except requests.RequestException as e:
-        logging.error(f"Error fetching URL {url}: {e}")
-        return None, None, None
-
-    try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        tabs_content = soup.find_all('div', class_='simpleTabsContent')
-        dataframes = []
-        
-        for tab_content in tabs_content:
-            table = tab_content.find('table', {'class': 'sortable'})
-            if table:
-                headers = []
-                for th in table.find('thead').find_all('th'):
-                    header = th.find('a')
-                    headers.append(header.text if header else th.text.strip())
-                
-                rows = []
-                tbody = table.find('tbody')
-                if tbody:
-                    for tr in tbody.find_all('tr'):
-                        row = []
-                        for td in tr.find_all('td'):
-                            cell = td.find('a')
-                            row.append(cell.text if cell else td.text.strip())
-                        rows.append(row)
-                
-                footer_rows = []
-                tfoot = table.find('tfoot')
-                if tfoot:
-                    for tr in tfoot.find_all('tr'):
-                        footer_row = []
-                        for td in tr.find_all('td'):
-                            footer_row.append(td.text.strip())
-                        footer_rows.append(footer_row)
-                
-                df = pd.DataFrame(rows, columns=headers)
-                columns_to_keep = ["Year", "Team", "#", "GM", "GL", "BH", "KI", "HB", "DI", "MK", "TK", "BR"]
-                filtered_df = df[columns_to_keep]
-                filtered_df = filtered_df.rename(columns=website_columns_mapping)
-                
-                stats_columns = ["GM", "GL", "BH", "KI", "HB", "DI", "MK", "TK", "BR"]
-                mapped_stats_columns = [website_columns_mapping[col] for col in stats_columns]
-                column_indices = [1, 7, 8, 3, 5, 6, 4, 10, 17]
-                
-                stats_df = pd.DataFrame(index=['Totals', 'Averages'], columns=filtered_df.columns)
-                stats_df[['Season', 'Team', 'No.']] = ''
-                
-                for stat_col, mapped_col, idx in zip(stats_columns, mapped_stats_columns, column_indices):
-                    stats_df.loc['Totals', website_columns_mapping[stat_col]] = footer_rows[0][idx].replace('b', '').strip()
-                    stats_df.loc['Averages', website_columns_mapping[stat_col]] = footer_rows[1][idx].strip()
-                
-                final_df = pd.concat([filtered_df, stats_df])
-                dataframes.append(final_df)
-                dob = get_player_dob(soup)
-
-        return tuple(dataframes) + (dob,) if dataframes else (None, None, None)
-    except Exception as e:
-        logging.error(f"Error parsing HTML from {url}: {str(e)}")
-        return None, None, None
+    import pandas as pd
+    
+    df = pd.DataFrame(rows, columns=headers)
+    columns_to_keep = ["Year", "Team", "#", "GM", "GL", "BH", "KI", "HB", "DI", "MK", "TK", "BR"]
+    filtered_df = df[columns_to_keep]
+    filtered_df = filtered_df.rename(columns=website_columns_mapping)
+    
+    stats_columns = ["GM", "GL", "BH", "KI", "HB", "DI", "MK", "TK", "BR"]
+    mapped_stats_columns = [website_columns_mapping[col] for col in stats_columns]
+    column_indices = [1, 7, 8, 3, 5, 6, 4, 10, 17]
+    
+    stats_df = pd.DataFrame(index=['Totals', 'Averages'], columns=filtered_df.columns)
+    stats_df[['Season', 'Team', 'No.']] = ''
+    
+    for stat_col, mapped_col, idx in zip(stats_columns, mapped_stats_columns, column_indices):
+        stats_df.loc['Totals', website_columns_mapping[stat_col]] = footer_rows[0][idx].replace('b', '').strip()
+        stats_df.loc['Averages', website_columns_mapping[stat_col]] = footer_rows[1][idx].strip()
+    
+    return pd.concat([filtered_df, stats_df])
 
 def get_user_inputs():
     while True:
@@ -234,9 +294,11 @@ def get_user_inputs():
                 print("Please enter a positive number of days")
                 continue
                 
-            year = int(input("Enter the year to scrape (e.g., 2024): "))
-            if year < 1897 or year > datetime.now().year:
-                print(f"Please enter a valid year between 1897 and {datetime.now().year}")
+            try:
+                years = parse_year_range(
+                    input("Enter the year or range of years to scrape (e.g., 2024, 2010-2024 or all): "))
+            except ValueError:
+                print(f"Please enter a valid year or range between {FIRST_SEASON} and {datetime.now().year}")
                 continue
             
             thread_count = int(input("Enter the number of players you want to update at same time (1-10): "))
@@ -244,51 +306,231 @@ def get_user_inputs():
                 print("Please enter a number between 1 and 20")
                 continue
                 
-            return days, year, thread_count
+            return days, years, thread_count
         except ValueError:
             print("Please enter valid numbers")
 
-def run_scraper(year, thread_count):
-    logging.info(f"Running scraper for year {year} with {thread_count} threads")
+def parse_year_range(text):
+    """'2024', '2010-2024' or 'all' -> list of years, oldest first. Raises ValueError outside FIRST_SEASON..now."""
+    text = text.strip().lower()
+    if text == "all":
+        first, last = FIRST_SEASON, datetime.now().year
+    elif "-" in text:
+        first, last = (int(part) for part in text.split("-", 1))
+    else:
+        first = last = int(text)
+    if not FIRST_SEASON <= first <= last <= datetime.now().year:
+        raise ValueError(f"Year range {text} outside {FIRST_SEASON}-{datetime.now().year}")
+    return list(range(first, last + 1))
+
+def describe_years(years):
+    return str(years[0]) if len(years) == 1 else f"{years[0]}-{years[-1]}"
+
+def discover_season_players(fetcher, years, base_url="https://afltables.com/afl/stats/", skip=(), previous_totals=None):
+    """
+    Yields each player of the season index pages for years once, newest season
+    first, minus names in skip. With previous_totals (from
+    PlayerTracker.get_season_totals) only players whose totals changed are yielded.
+    """
+    urls = {year: f"{base_url}{year}.html" for year in years}
+    fetcher.prefetch(list(urls.values()))
+    players_by_name = {}
+    yielded = set()
+    previous = {}
+    fetched = 0
+    # Newest first, so current players are queued ahead of retired ones
+    for year in sorted(urls, reverse=True):
+        html_content = fetcher.fetch(urls[year])
+        if html_content is None:
+            logging.error(f"Failed to fetch season index {urls[year]}")
+            continue
+        fetched += 1
+        for player in iter_season_index(html_content, base_url, skip):
+            player_name = player['Player Name']
+            known = players_by_name.setdefault(player_name, player)
+            known.setdefault('Season Totals', {}).setdefault(year, {})[player.pop('Club')] = player.pop('Totals')
+            if player_name in yielded:
+                continue
+            if previous_totals is not None:
+                key = (player_name, year)
+                if key not in previous:
+                    previous[key] = parse_season_snapshot(previous_totals.get(key))
+                club_totals = known['Season Totals'][year]
+                if all(previous[key].get(club) == totals for club, totals in club_totals.items()):
+                    continue
+            yielded.add(player_name)
+            yield known
+    if not fetched:
+        raise Exception(f"Failed to fetch any season index for {describe_years(years)}")
+    skipped = len(players_by_name) - len(yielded)
+    logging.info(f"{len(players_by_name)} players listed on {fetched} season index pages")
+    if skipped:
+        logging.info(f"{skipped} players have unchanged season totals - skipped their profiles")
+        METRICS.count("skipped", skipped)
+
+def season_snapshot(club_totals):
+    """{club: totals} for one season -> the text stored in the tracker, tagged with WIKI_MARKUP_VERSION."""
+    return f"v{WIKI_MARKUP_VERSION}:" + ";".join(f"{club}={totals}" for club, totals in sorted(club_totals.items()))
+
+def parse_season_snapshot(snapshot):
+    """Inverse of season_snapshot; {} for no snapshot or one taken with another WIKI_MARKUP_VERSION."""
+    prefix = f"v{WIKI_MARKUP_VERSION}:"
+    if not snapshot or not snapshot.startswith(prefix):
+        return {}
+    return dict(entry.split("=", 1) for entry in snapshot[len(prefix):].split(";") if "=" in entry)
+
+def store_season_totals(tracker, players):
+    """Saves the season index totals of every player the run has processed, for the next incremental run."""
+    for player in players:
+        if player['Player Name'] in tracker.processed_players:
+            tracker.set_season_totals(player['Player Name'], {
+                season: season_snapshot(club_totals) for season, club_totals in player.get('Season Totals', {}).items()
+            })
+
+def _index_number(text):
+    try:
+        return int((text or "").strip() or 0)
+    except ValueError:
+        return 0
+
+def iter_index_rows(html_content, columns, backend=None):
+    if (backend or PARSER_BACKEND) == "lxml":
+        return iter_index_rows_lxml(html_content, columns)
+    return iter_index_rows_bs4(html_content, columns)
+
+def iter_index_rows_bs4(html_content, columns):
+    """
+    BeautifulSoup backend for iter_index_rows: same (club, profile_href, values)
+    rows as fast_parser.iter_index_rows_lxml. Only the sortable tables are
+    parsed (SoupStrainer), but the page is parsed in one go before the first row.
+    """
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=SoupStrainer("table", class_="sortable"))
+    for table in soup.find_all("table", class_="sortable"):
+        club = None
+        positions = [None] * len(columns)
+        for row in table.find_all("tr"):
+            headers = [th.get_text(strip=True) for th in row.find_all("th")]
+            if "Player" in headers:
+                positions = [headers.index(column) if column in headers else None for column in columns]
+            elif len(headers) == 1:
+                club = headers[0].split('[')[0].strip()
+            cells = row.find_all("td")
+            if len(cells) > 1 and cells[1].find("a"):
+                values = [cells[i].get_text().strip() if i is not None and i < len(cells) else None
+                          for i in positions]
+                yield club, cells[1].find("a")["href"], values
+
+def iter_season_index(html_content, base_url="https://afltables.com/afl/stats/", skip=()):
+    """
+    Player name, profile link, club and totals (INDEX_TOTAL_COLUMNS joined by "/") for
+    every player row of a season stats page as it is parsed, minus names in
+    skip. A player traded mid-season has a row under each club.
+    """
+    for club, player_link, values in iter_index_rows(html_content, INDEX_TOTAL_COLUMNS):
+        player_name = player_link.split("/")[-1].replace(".html", "")
+        if player_name not in skip:
+            yield {
+                "Player Name": player_name,
+                "Profile Link": base_url + player_link,
+                "Club": club or "",
+                "Totals": "/".join(str(_index_number(value)) for value in values)
+            }
+
+def parse_season_index(html_content, base_url="https://afltables.com/afl/stats/", skip=()):
+    """All of iter_season_index as a list, one entry per player with their rows' totals in 'Totals' ({club: totals})."""
+    players = {}
+    for player in iter_season_index(html_content, base_url, skip):
+        club, totals = player.pop('Club'), player.pop('Totals')
+        players.setdefault(player['Player Name'], dict(player, Totals={}))['Totals'][club] = totals
+    return list(players.values())
+
+def write_run_metrics(directory=METRICS_DIR):
+    """Writes metrics.prom (Prometheus text) and run_summary.json for the run so far."""
+    METRICS.write_prometheus(os.path.join(directory, "metrics.prom"))
+    METRICS.write_summary(os.path.join(directory, "run_summary.json"))
+    counters = METRICS.summary()["counters"]
+    logging.info("Run summary: " + ", ".join(f"{name} {value}" for name, value in counters.items()))
+
+def run_scraper(year, thread_count, fetch_concurrency=16, use_cache=True, work_stealing=False, adaptive=True,
+                scrape_workers=8, queue_size=64, dry_run_dir=None, wikitext_dir=None, fetch_missing_wikitext=True,
+                incremental=True, processes=0, archive_pages=True, time_limit_minutes=None):
+    """
+    Scrapes every player of the given season(s) and updates their Wikipedia
+    pages; with dry_run_dir, diffs are written there instead of editing.
+    Returns False if the run stopped on an error or its time limit, True otherwise.
+    """
+    years = [year] if isinstance(year, int) else sorted(year)
+    logging.info(f"Running scraper for {describe_years(years)} with {thread_count} threads"
+                 + (f" (dry run into {dry_run_dir})" if dry_run_dir else ""))
+    METRICS.reset()
     
-    wiki_site = initialize_apis()
-    tracker = PlayerTracker()
+    dry_run = DryRun(dry_run_dir, wikitext_dir) if dry_run_dir else None
+    if dry_run is None:
+        wiki_site = initialize_apis()
+        tracker = PlayerTracker()
+    else:
+        wiki_site = initialize_apis(login=False) if fetch_missing_wikitext else None
+        tracker = dry_run.open_tracker()
+    edit_limiter = None if dry_run else WIKI_EDIT_LIMITER
+    title_cache = TitleCache()
     
-    url = f"https://afltables.com/afl/stats/{year}.html"
-    base_url = "https://afltables.com/afl/stats/"
+    base_url = STATS_BASE_URL
     
+    cache = ResponseCache(processed_version=WIKI_MARKUP_VERSION) if use_cache else None
+    engine = FetchEngine(per_host_limit=fetch_concurrency, cache=cache).start()
+    fetcher = DryRunFetcher(engine, cache) if dry_run else engine
+    cpu_pool = CpuPool(processes) if processes else None
+    # Dry runs leave every piece of real state alone, the archive included
+    archive = PageArchive() if archive_pages and dry_run is None else None
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        tables = soup.find_all("table", class_="sortable")
+        # Only an interrupted run skips the players it already processed
+        resuming = tracker.start_run()
+        skip = set(tracker.processed_players) if resuming else set()
+        if resuming:
+            logging.info(f"Resuming an interrupted run - skipping {len(skip)} players already processed")
+        previous_totals = tracker.get_season_totals(years) if incremental else None
         players_data = []
+        deadline = None if time_limit_minutes is None else time.monotonic() + time_limit_minutes * 60
         
-        for table in tables:
-            for row in table.find_all("tr")[1:]:
-                columns = row.find_all("td")
-                if len(columns) > 1:
-                    player_cell = columns[1]
-                    if player_cell and player_cell.find("a"):
-                        player_link = player_cell.find("a")["href"]
-                        player_name = player_link.split("/")[-1].replace(".html", "")
-                        
-                        if player_name not in tracker.processed_players:
-                            full_link = base_url + player_link
-                            players_data.append({"Player Name": player_name, "Profile Link": full_link})
+        def discover(pipeline):
+            # Each profile fetch starts as soon as its player is found
+            for player in discover_season_players(fetcher, years, base_url, skip, previous_totals):
+                # Once the pipeline has stopped, the rest are only counted
+                if not pipeline.stopping.is_set():
+                    fetcher.prefetch([player['Profile Link']])
+                players_data.append(player)
+                yield player
         
-        tracker.tracker["total_players"] = len(players_data)
-        tracker.save_tracker()
+        # Only players that reach the wiki stage are queued for title resolution,
+        # in the order the wiki workers will ask for them
+        preloader = PagePreloader(wiki_site, title_cache=title_cache)
+        if dry_run is not None:
+            dry_run.preloader = preloader if wiki_site is not None else None
+            preloader = dry_run
         
-        # First pass - process all players
-        chunk_size = max(1, len(players_data) // thread_count)
-        players_chunks = [players_data[i:i + chunk_size] for i in range(0, len(players_data), chunk_size)]
+        def make_pipeline():
+            return Pipeline(
+                scrape=lambda player: scrape_player(player, tracker, fetcher=fetcher, cpu_pool=cpu_pool,
+                                                    archive=archive, incremental=incremental),
+                publish=lambda payload: publish_player(payload, tracker, wiki_site, fetcher=fetcher, preloader=preloader,
+                                                       edit_limiter=edit_limiter, cpu_pool=cpu_pool, archive=archive),
+                scrape_workers=scrape_workers,
+                publish_workers=thread_count,
+                queue_size=queue_size,
+                work_stealing=work_stealing,
+                adaptive=adaptive,
+                on_enqueue=lambda payload: preloader.expect([payload['player']['Player Name']]),
+                time_limit=None if deadline is None else max(0, deadline - time.monotonic())
+            )
         
+        # First pass - process all players
         logging.info("Starting first pass...")
-        process_chunks_with_executor(players_chunks, tracker, wiki_site, thread_count)
+        pipeline = make_pipeline()
+        pipeline.run(discover(pipeline))
+        tracker.set_total_players(len(players_data))
         
         # Second pass - retry failed players
-        if tracker.failed_players:
+        if tracker.failed_players and not pipeline.stopping.is_set():
             logging.info(f"Starting second pass for {len(tracker.failed_players)} failed players...")
             failed_players_data = [
                 p for p in players_data 
@@ -296,51 +538,95 @@ def run_scraper(year, thread_count):
             ]
             
             # Clear failed players list before second pass
-            tracker.failed_players = []
-            pd.DataFrame(columns=['Player Name']).to_csv(tracker.failed_file, index=False)
+            tracker.clear_failed()
             
-            failed_chunks = [failed_players_data[i:i + chunk_size] 
-                           for i in range(0, len(failed_players_data), chunk_size)]
-            
-            process_chunks_with_executor(failed_chunks, tracker, wiki_site, thread_count)
+            pipeline = make_pipeline()
+            pipeline.run(failed_players_data)
         
-        if tracker.tracker["processed_count"] >= tracker.tracker["total_players"]:
-            logging.info("All players processed. Resetting tracker...")
-            tracker.reset_tracker()
+        store_season_totals(tracker, players_data)
+        if pipeline.stopping.is_set():
+            logging.error(f"Run stopped after the {time_limit_minutes} minute time limit - the next run resumes it")
+            return False
+        tracker.finish_run()
+        return True
             
     except Exception as e:
         logging.error(f"Error in run_scraper: {str(e)}")
+        return False
+    finally:
+        if cpu_pool is not None:
+            cpu_pool.close()
+        if archive is not None:
+            archive.close()
+        engine.close()
+        tracker.close()
+        title_cache.close()
+        if dry_run is not None:
+            dry_run.write_report()
+        write_run_metrics(dry_run_dir or METRICS_DIR)
 
-def process_chunks_with_executor(chunks, tracker, wiki_site, thread_count):
-    with concurrent.futures.ThreadPoolExecutor(max_workers=thread_count) as executor:
-        futures = []
-        for chunk in chunks:
-            future = executor.submit(process_players_thread, chunk, tracker, wiki_site)
-            futures.append(future)
-        
-        try:
-            done, not_done = concurrent.futures.wait(
-                futures, 
-                timeout=3600,  # 1 hour timeout
-                return_when=concurrent.futures.ALL_COMPLETED
-            )
-            
-            # Cancel any incomplete futures
-            for future in not_done:
-                future.cancel()
-                
-            # Check for exceptions
-            for future in done:
-                try:
-                    future.result()
-                except Exception as e:
-                    logging.error(f"Thread error: {str(e)}")
-                    
-        except concurrent.futures.TimeoutError:
-            logging.error("Processing timed out after 1 hour")
-            
-        finally:
-            executor.shutdown(wait=False)
+def replay_player(job):
+    """
+    One player of run_replay, in a worker process: parses the archived profile,
+    renders and merges it into the archived wikitext and writes the result as
+    in a dry run. Returns (player_name, outcome, details).
+    """
+    archive_dir, output_dir, player_name, url, profile_sha, wikitext_sha, title, source = job
+    try:
+        html_content = read_object(archive_dir, profile_sha)
+        current_content = read_object(archive_dir, wikitext_sha)
+        if html_content is None or current_content is None:
+            return player_name, "failed", "archived page missing"
+        parsed = parse_profile_payload(html_content, url)
+        if parsed is None:
+            return player_name, "failed", "could not parse profile"
+        rendered = render_statistics_update(parsed[0], player_name, source or "", current_content)
+        if rendered is None:
+            return player_name, "failed", "could not render statistics"
+        updated_content, changes = rendered
+        if changes == [] or updated_content == current_content:
+            return player_name, "unchanged", None
+        lines_changed = write_page_diff(output_dir, player_name, title or player_name, current_content, updated_content)
+        return player_name, "edited", {"title": title or player_name, "lines_changed": lines_changed}
+    except Exception as e:
+        return player_name, "failed", str(e)
+
+def run_replay(output_dir, archive_dir=DEFAULT_ARCHIVE_DIR, processes=None, player_names=None):
+    """
+    Reruns parsing, rendering and the Statistics merge for every player with
+    both an archived profile and archived wikitext (the latest of each), on
+    all cores and without the network. Output matches a dry run: <player>.wiki
+    and <player>.diff for each page that would change, plus index.json.
+    """
+    METRICS.reset()
+    os.makedirs(output_dir, exist_ok=True)
+    archive = PageArchive(archive_dir)
+    try:
+        profiles = archive.latest("profile")
+        wikitexts = archive.latest("wikitext")
+    finally:
+        archive.close()
+    
+    jobs = []
+    for url, (profile_sha, _, _) in profiles.items():
+        player_name = url.split("/")[-1].replace(".html", "")
+        if player_name in wikitexts and (player_names is None or player_name in player_names):
+            wikitext_sha, title, source = wikitexts[player_name]
+            jobs.append((archive_dir, output_dir, player_name, url, profile_sha, wikitext_sha, title, source))
+    logging.info(f"Replaying {len(jobs)} archived players into {output_dir}")
+    
+    results = {}
+    with METRICS.timer("replay"), CpuPool(processes) as cpu_pool:
+        for player_name, outcome, details in cpu_pool.map(replay_player, jobs):
+            METRICS.count(outcome)
+            if outcome == "edited":
+                results[player_name] = details
+            elif outcome == "failed":
+                logging.error(f"Replay failed for {player_name}: {details}")
+    write_diff_index(output_dir, results)
+    write_run_metrics(output_dir)
+    logging.info(f"Replay: {len(results)} of {len(jobs)} pages would be edited, diffs in {output_dir}")
+    return results
 
 def convert_dataframes_to_json(stats_df, total_career_df, votes_df, averages_df):
     data_dict = {
@@ -351,6 +637,19 @@ def convert_dataframes_to_json(stats_df, total_career_df, votes_df, averages_df)
     }
     return data_dict
 
+def compute_stats_fingerprint(json_output):
+    """
+    Stable hash of a player's season rows, averages, career totals and votes.
+    WIKI_MARKUP_VERSION is folded in so a change to the rendered table
+    invalidates every stored fingerprint.
+    """
+    payload = json.dumps(
+        {"markup_version": WIKI_MARKUP_VERSION, "data": json_output},
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 def get_player_dob(soup):
     try:
         born_element = soup.find(string=lambda text: "Born:" in text if text else False)
@@ -368,21 +667,40 @@ def get_player_dob(soup):
         print(f"Error parsing data: {e}")
         return None
 
+def env_processes():
+    """
+    PARSE_PROCESSES from the environment or .env: worker processes for parsing
+    and rendering when --processes isn't given; 0 keeps them in the pipeline threads.
+    """
+    value = os.getenv("PARSE_PROCESSES", "0")
+    try:
+        return max(0, int(value))
+    except ValueError:
+        logging.warning(f"Ignoring invalid PARSE_PROCESSES={value!r}")
+        return 0
+
 def schedule_scraper():
-    days, year, thread_count = get_user_inputs()
+    days, years, thread_count = get_user_inputs()
+    
+    # Optional live Prometheus endpoint; the files under METRICS_DIR are written either way
+    metrics_port = os.getenv("METRICS_PORT")
+    if metrics_port:
+        METRICS.serve(int(metrics_port))
+    
+    processes = env_processes()
     
     def job():
-        run_scraper(year, thread_count)
+        run_scraper(years, thread_count, processes=processes)
     
-    logging.info(f"Running first scrape for year {year} with {thread_count} threads")
-    run_scraper(year, thread_count)
+    logging.info(f"Running first scrape for {describe_years(years)} with {thread_count} threads")
+    run_scraper(years, thread_count, processes=processes)
     
     schedule.every(days).days.do(job)
     
     logging.info(f"\nFirst scrape completed. Next run will be in {days} days.")
     logging.info("Press Ctrl+C to stop the scheduler")
     
-    next_run = datetime.now() + pd.Timedelta(days=days)
+    next_run = datetime.now() + timedelta(days=days)
     logging.info(f"Next scheduled run: {next_run.strftime('%Y-%m-%d %H:%M:%S')}")
     
     while True:
@@ -393,6 +711,94 @@ def schedule_scraper():
             logging.info("\nScheduler stopped by user")
             sys.exit()
 
+def run_daemon(config):
+    """
+    Non-interactive mode: polls the newest season index and runs the scraper
+    only when it has changed, within the config's quiet hours and daily cap.
+    config is load_daemon_config()'s dict; without "years" each run follows
+    the current season, so the daemon moves on to a new season by itself.
+    """
+    years = config["years"]
+    if isinstance(years, (str, int)):
+        years = parse_year_range(str(years))
+    
+    metrics_port = config["metrics_port"] or os.getenv("METRICS_PORT")
+    if metrics_port:
+        METRICS.serve(int(metrics_port))
+    
+    processes = config["processes"] if config["processes"] is not None else env_processes()
+    
+    def current_years():
+        return years or [datetime.now().year]
+    
+    def job():
+        return run_scraper(current_years(), config["threads"], processes=processes,
+                           incremental=config["incremental"], archive_pages=config["archive"],
+                           time_limit_minutes=config["time_limit_minutes"])
+    
+    scheduler = ChangeTriggeredScheduler(
+        job,
+        index_url=lambda: f"{STATS_BASE_URL}{max(current_years())}.html",
+        cache=ResponseCache(processed_version=WIKI_MARKUP_VERSION),
+        poll_minutes=config["poll_minutes"],
+        quiet_hours=parse_quiet_hours(config["quiet_hours"]),
+        max_runs_per_day=config["max_runs_per_day"]
+    )
+    scheduler.run_forever()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape AFL Tables and update player statistics on Wikipedia. "
+                                                 "Without arguments the scheduler asks for its settings.")
+    parser.add_argument("--dry-run", metavar="OUTPUT_DIR",
+                        help="run once without editing; write new wikitext and diffs per player to OUTPUT_DIR")
+    parser.add_argument("--wikitext-dir", help="local <player>.wiki files to use as the current pages "
+                                               "(default OUTPUT_DIR/wikitext)")
+    parser.add_argument("--no-fetch-wikitext", action="store_true",
+                        help="only use local wikitext; players without a file are skipped")
+    parser.add_argument("--year", type=parse_year_range,
+                        help="season, range of seasons (2010-2024) or 'all' (default: the current season)")
+    parser.add_argument("--threads", type=int, help="players updated at the same time (default 10)")
+    parser.add_argument("--processes", type=int, nargs="?", const=os.cpu_count() or 1,
+                        help="parse and render in N worker processes (one per core if N is left out)")
+    parser.add_argument("--replay", metavar="OUTPUT_DIR",
+                        help="rerun parsing and the merge over the page archive, offline, writing diffs to OUTPUT_DIR")
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR, help="page archive to replay")
+    parser.add_argument("--no-archive", action="store_true", help="don't archive fetched pages")
+    parser.add_argument("--full", action="store_true",
+                        help="fetch every profile and merge every page again, even players whose stats are unchanged")
+    parser.add_argument("--time-limit", type=int, metavar="MINUTES",
+                        help="stop a run after MINUTES; the next run resumes where it stopped")
+    parser.add_argument("--daemon", action="store_true",
+                        help="run unattended: poll the season index and scrape only when it changes")
+    parser.add_argument("--config", help="JSON file with daemon settings; command line flags override it")
+    parser.add_argument("--poll-minutes", type=int, help="how often the daemon polls the season index (default 15)")
+    parser.add_argument("--quiet-hours", help="local hours in which the daemon never starts a run, e.g. 22-7")
+    parser.add_argument("--max-runs-per-day", type=int, help="daemon runs allowed per day, 0 for no cap (default 4)")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    # Before anything reads METRICS_PORT or the other .env settings
+    load_dotenv()
     os.makedirs("player_data", exist_ok=True)
-    schedule_scraper()
\ No newline at end of file
+    args = parse_args()
+    if args.replay:
+        run_replay(args.replay, args.archive_dir, processes=args.processes or None)
+    elif args.daemon or args.config:
+        run_daemon(load_daemon_config(args.config, {
+            "years": args.year,
+            "threads": args.threads,
+            "processes": args.processes,
+            "poll_minutes": args.poll_minutes,
+            "quiet_hours": args.quiet_hours,
+            "max_runs_per_day": args.max_runs_per_day,
+            "time_limit_minutes": args.time_limit,
+            "incremental": False if args.full else None,
+            "archive": False if args.no_archive else None
+        }))
+    elif args.dry_run:
+        run_scraper(args.year or [datetime.now().year], args.threads or 10, dry_run_dir=args.dry_run, wikitext_dir=args.wikitext_dir,
+                    fetch_missing_wikitext=not args.no_fetch_wikitext, incremental=not args.full,
+                    processes=args.processes if args.processes is not None else env_processes(),
+                    archive_pages=not args.no_archive, time_limit_minutes=args.time_limit)
+    else:
+        schedule_scraper()
\ No newline at end of file
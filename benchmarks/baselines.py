@@ -0,0 +1,275 @@
+"""
+Implementations the scraper has since replaced, kept only as parity and
+speed baselines for the benchmarks. Nothing outside benchmarks/ imports them.
+"""
+import logging
+import re
+from datetime import datetime
+
+
+# String-concatenating renderer that generate_wiki_markup replaced; baseline for bench_render.py
+def generate_wiki_markup_legacy(data, player_name, player_url, end_round=None, end_year=None):
+    try:
+        stats_df = data["stats_df"]
+        averages_df = data["averages_df"]
+        votes_dict = data["votes_df"][0]
+
+        last_entry = stats_df[-1]
+        if end_year is None:
+            end_year = last_entry["Season"]
+        if end_round is None:
+            end_round = last_entry["Games"]
+
+        header = (
+            "==Statistics==\n"
+            f"''Updated to the end of the {end_year} season''."
+            f"<ref>{{{{cite web|url={player_url}|title={player_name}|publisher=AFL Tables|access-date={datetime.now().strftime('%d %B %Y')}}}}}</ref>\n\n"
+            "{{AFL player statistics legend|p=y}}\n"
+            "{{AFL player statistics start with votes}}\n"
+        )
+
+        body = header
+        stats_keys = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T"]
+        avg_keys   = ["G", "B", "K", "H", "D", "M", "T"]
+
+        for i, stat in enumerate(stats_df):
+            season = stat["Season"]
+            avg = next((a for a in averages_df if a["Season"] == season), {})
+            
+            body += "|-\n"  # Always start with |-
+            
+            season_link = f"[[{season} AFL season|{season}]]"
+            body += f"| {season_link}"  # No scope="row" or style attributes
+            
+            team = stat.get("Team", "")
+            body += f" || {team}"  # Use || instead of | for team
+            
+            for j, key in enumerate(stats_keys):
+                value = stat.get(key, "")
+                body += f" || {value}"  # Use || for all stats
+            
+            for key in avg_keys:
+                value = avg.get(key, "")
+                body += f" || {value}"
+            
+            votes = votes_dict.get(season, 0)
+            body += f" || {votes}\n"
+        
+        career_stats = data["total_career_df"][0]
+        career_avgs  = data["total_career_df"][1]
+        career_votes = votes_dict.get("Total Votes", 0)
+        
+        body += "|-\n"
+        body += "! colspan=3| Career\n"
+        
+        career_stats_order = ["Games", "G", "B", "K", "H", "D", "M", "T"]
+        for key in career_stats_order:
+            value = career_stats.get(key, "")
+            body += f"! {value}\n"
+        
+        for key in avg_keys:
+            value = career_avgs.get(key, "")
+            body += f"! {value}\n"
+        
+        body += f"! {career_votes}\n"
+        body += "|}\n\n"
+        
+        return body
+    except Exception as e:
+        logging.error(f"Error generating wiki markup: {str(e)}")
+        return None
+
+
+# Line-regex formatting merge that wikitable replaced; baseline for bench_wikitable.py and bench_stages.py
+def extract_special_formatting(wikitext):
+    """
+    Extract special formatting from the existing wikitext:
+    - Bold text for leading players (bgcolor=CAE1FF with '''value''')
+    - Special year formatting (bgcolor=F0E68C)
+    - Notes ({{efn|...}})
+    """
+    special_formatting = {
+        'leading_stats': {},  # Format: {season: {stat_key: value}}
+        'special_years': {},  # Format: {season: formatting}
+        'notes': {}           # Format: {season: note_text}
+    }
+    
+    # Extract leading stats (bold text with bgcolor)
+    leading_pattern = leading_pattern = re.compile(r'\|\s*bgcolor=CAE1FF\s*\|\s*\'\'\'([^<]*?)\'\'\'(?:<sup>†</sup>)?')
+    leading_matches = leading_pattern.finditer(wikitext)
+    
+    # Find season context for each match
+    season_pattern = re.compile(r'\|\s*\[\[(\d{4})[^\]]*\]\]')
+    special_year_pattern = re.compile(r'\|\s*bgcolor=F0E68C\s*\|\s*\'\'\'(?:\[\[(\d{4})[^\]]*\]\])\'\'\'(?:<sup>#</sup>)?')
+    notes_pattern = re.compile(r'\[\[(\d{4})[^\]]*\]\]({{efn\|[^}]*}})')
+    
+    # Process the wikitext line by line to associate seasons with stats
+    lines = wikitext.split('\n')
+    current_season = None
+    
+    for i, line in enumerate(lines):
+        # Check for regular season
+        season_match = season_pattern.search(line)
+        if season_match:
+            current_season = season_match.group(1)
+            
+            # Check for notes in this season
+            notes_match = notes_pattern.search(line)
+            if notes_match:
+                note_text = notes_match.group(2)
+                special_formatting['notes'][current_season] = note_text
+            elif '{{efn|' in line:
+                note_start = line.find('{{efn|')
+                note_end = line.find('}}', note_start)
+                if note_end > note_start:
+                    note_text = line[note_start:note_end+2]
+                    special_formatting['notes'][current_season] = note_text
+        
+        # Check for special year formatting
+        special_year_match = special_year_pattern.search(line)
+        if special_year_match:
+            current_season = special_year_match.group(1)
+            # Store the entire line including the team info
+            special_formatting['special_years'][current_season] = line.strip()
+            # If there's a note in the next line, associate it with this season
+            if i + 1 < len(lines) and '{{efn|' in lines[i + 1]:
+                note_start = lines[i + 1].find('{{efn|')
+                note_end = lines[i + 1].find('}}', note_start)
+                if note_end > note_start:
+                    note_text = lines[i + 1][note_start:note_end+2]
+                    special_formatting['notes'][current_season] = note_text
+        
+        # If we have a current season, check for leading stats
+        if current_season and 'bgcolor=CAE1FF' in line:
+            # Initialize dict for this season if not exists
+            if current_season not in special_formatting['leading_stats']:
+                special_formatting['leading_stats'][current_season] = {}
+                
+            # Extract the stat value and position
+            leading_match = leading_pattern.search(line)
+            if leading_match:
+                # Determine which stat this is based on position in the line
+                # This is approximate and may need refinement
+                stat_value = leading_match.group(1).strip()
+                
+                # Count the number of "||" before this match to determine the stat type
+                line_before_match = line[:leading_match.start()]
+                separator_count = line_before_match.count('||')
+                
+                # Map separator count to stat key (approximate mapping)
+                stat_keys = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T", "G_avg", "B_avg", "K_avg", "H_avg", "D_avg", "M_avg", "T_avg", "Votes"]
+                if separator_count < len(stat_keys):
+                    stat_key = stat_keys[separator_count]
+                    special_formatting['leading_stats'][current_season][stat_key] = stat_value
+    
+    return special_formatting
+
+def apply_special_formatting(new_markup, special_formatting):
+    """
+    Apply the extracted special formatting to the new markup
+    """
+    lines = new_markup.split('\n')
+    updated_lines = []
+    current_season = None
+    skip_next_line = False
+    
+    for i, line in enumerate(lines):
+        if skip_next_line:
+            skip_next_line = False
+            continue
+            
+        # Check if this line contains a season
+        season_match = re.search(r'\|\s*\[\[(\d{4})[^\]]*\]\]', line)
+        
+        if season_match:
+            current_season = season_match.group(1)
+            
+            # Apply special year formatting if exists
+            if current_season in special_formatting['special_years']:
+                # Get the original line's statistics
+                stats_parts = line.split('||')
+                if len(stats_parts) > 1:
+                    # Extract the special formatting but keep our season and stats
+                    special_year_line = special_formatting['special_years'][current_season]
+                    season_end_idx = special_year_line.find(']]') + 2
+                    
+                    # Add closing ''' and <sup>#</sup> if they exist in special formatting
+                    season_part = special_year_line[:season_end_idx]
+                    if "'''" in special_year_line and not season_part.endswith("'''"):
+                        season_part += "'''"
+                    if "<sup>#</sup>" in special_year_line:
+                        season_part += "<sup>#</sup>"
+                    
+                    # Combine special formatting for season with existing stats
+                    line = season_part + ' ||' + '||'.join(stats_parts[1:])
+                
+                # Skip the next line (team info) as it's included in the special formatting
+                if i + 1 < len(lines) and "{{AFL Col}}" in lines[i + 1]:
+                    skip_next_line = True
+            
+            # Apply notes if exists
+            if current_season in special_formatting['notes']:
+                note_text = special_formatting['notes'][current_season]
+                # Insert the note after the season
+                season_end = line.find(']]')
+                if season_end > 0:
+                    line = line[:season_end+2] + note_text + line[season_end+2:]
+        
+        # If we have a current season with leading stats, apply them
+        if current_season and current_season in special_formatting['leading_stats']:
+            leading_stats = special_formatting['leading_stats'][current_season]
+            
+            # For each stat in leading_stats, check if it's in this line
+            for stat_key, stat_value in leading_stats.items():
+                # Different handling for regular stats vs averages
+                if '_avg' in stat_key:
+                    base_key = stat_key.split('_')[0]
+                    # Find the average value in the line (after the regular stat)
+                    avg_pattern = re.compile(r'\|\|\s*(\d+\.\d+)\s*(?=\|\|)')
+                    matches = list(avg_pattern.finditer(line))
+                    
+                    # Map stat keys to positions in the averages section
+                    avg_keys = ["G", "B", "K", "H", "D", "M", "T"]
+                    if base_key in avg_keys:
+                        idx = avg_keys.index(base_key)
+                        if idx < len(matches):
+                            # Replace with formatted version
+                            match = matches[idx]
+                            line = line[:match.start()] + '|| bgcolor=CAE1FF | ' + f"'''{stat_value}'''<sup>†</sup>" + line[match.end():]
+                else:
+                    # Regular stats
+                    stat_keys = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T"]
+                    if stat_key in stat_keys:
+                        idx = stat_keys.index(stat_key)
+                        
+                        # Find the stat value in the line
+                        if idx == 0:
+                            # First stat has different format
+                            stat_pattern = re.compile(r'\|\s*(\d+)\s*(?=\|\|)')
+                        else:
+                            # Other stats
+                            stat_pattern = re.compile(r'\|\|\s*(\d+)\s*(?=\|\|)')
+                        
+                        matches = list(stat_pattern.finditer(line))
+                        if idx < len(matches):
+                            # Replace with formatted version
+                            match = matches[idx]
+                            line = line[:match.start()] + ('| ' if idx == 0 else '|| ') + 'bgcolor=CAE1FF | ' + f"'''{stat_value}'''<sup>†</sup>" + line[match.end():]
+                    elif stat_key == "Votes":
+                        # Votes are at the end of the line
+                        votes_pattern = re.compile(r'\|\|\s*(\d+)\s*$')
+                        match = votes_pattern.search(line)
+                        if match:
+                            line = line[:match.start()] + '|| bgcolor=CAE1FF | ' + f"'''{stat_value}'''<sup>†</sup>"
+        
+        # Special handling for career row
+        if "class=sortbottom" in line:
+            # Keep the next line (career header) as is
+            updated_lines.append(line)
+            if i + 1 < len(lines):
+                updated_lines.append(lines[i + 1])
+                skip_next_line = True
+        else:
+            updated_lines.append(line)
+    
+    return '\n'.join(updated_lines)
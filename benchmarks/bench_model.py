@@ -0,0 +1,55 @@
+"""
+Parity check and benchmark for the pandas-free PlayerStats model against the
+DataFrame path (build_tab_dataframe -> process_player_stats ->
+convert_dataframes_to_json).
+
+    python benchmarks/bench_model.py [--pages N] [--repeat N]
+"""
+import argparse
+import sys
+import time
+
+import corpus
+from afl_scraper import build_tab_dataframe, convert_dataframes_to_json, extract_profile
+from player_model import PlayerStats
+from wikipedia_updater import process_player_stats
+
+
+def dataframe_path(tabs):
+    stats_df, averages_df = (build_tab_dataframe(*tab) for tab in tabs)
+    return convert_dataframes_to_json(*process_player_stats(stats_df, averages_df))
+
+
+def model_path(tabs):
+    return PlayerStats.from_tabs(tabs).to_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tabs_corpus = [(name, extract_profile(html)[0]) for name, html in corpus.profile_corpus(args.pages)]
+
+    mismatches = [name for name, tabs in tabs_corpus if dataframe_path(tabs) != model_path(tabs)]
+    for name in mismatches:
+        print(f"MISMATCH {name}")
+    print(f"parity: {len(tabs_corpus) - len(mismatches)}/{len(tabs_corpus)} players identical")
+    if mismatches:
+        sys.exit(1)
+
+    total = len(tabs_corpus) * args.repeat
+    results = {}
+    for name, build in (("pandas", dataframe_path), ("model", model_path)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, tabs in tabs_corpus:
+                build(tabs)
+        results[name] = time.perf_counter() - start
+        print(f"{name:>6}: {results[name] * 1000 / total:8.3f} ms/player  {total / results[name]:9.1f} players/s")
+    print(f"speedup: {results['pandas'] / results['model']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Parity check and benchmark for the profile page parser backends.
+
+    python benchmarks/bench_parser.py [--pages N] [--repeat N]
+
+Every page in the corpus is parsed with both backends first; any difference
+in the extracted tables, DOB or resulting DataFrames aborts the run before
+timings are reported.
+"""
+import argparse
+import sys
+import time
+
+import corpus
+from afl_scraper import extract_profile_tables, parse_player_page
+from fast_parser import extract_profile_tables_lxml
+
+BACKENDS = {
+    "bs4": extract_profile_tables,
+    "lxml": extract_profile_tables_lxml,
+}
+
+
+def _same(a, b):
+    if hasattr(a, "equals"):
+        return b is not None and a.equals(b)
+    return a == b
+
+
+def check_parity(pages):
+    failures = 0
+    for name, html in pages:
+        expected = extract_profile_tables(html)
+        actual = extract_profile_tables_lxml(html)
+        frames_bs4 = parse_player_page(html, name, backend="bs4")
+        frames_lxml = parse_player_page(html, name, backend="lxml")
+        same_frames = all(_same(a, b) for a, b in zip(frames_bs4, frames_lxml))
+        if expected != actual or not same_frames:
+            failures += 1
+            print(f"MISMATCH {name}")
+    return failures
+
+
+def time_backend(extract, pages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for _, html in pages:
+            extract(html)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40, help="generated pages to add to the fixtures")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pages = corpus.profile_corpus(args.pages)
+    failures = check_parity(pages)
+    print(f"parity: {len(pages) - failures}/{len(pages)} pages identical")
+    if failures:
+        sys.exit(1)
+
+    total = len(pages) * args.repeat
+    results = {name: time_backend(extract, pages, args.repeat) for name, extract in BACKENDS.items()}
+    for name, elapsed in results.items():
+        print(f"{name:>5}: {elapsed * 1000 / total:8.3f} ms/page  {total / elapsed:9.1f} pages/s")
+    print(f"speedup: {results['bs4'] / results['lxml']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
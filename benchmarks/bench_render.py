@@ -0,0 +1,58 @@
+"""
+Parity check and microbenchmark for generate_wiki_markup against the
+string-concatenating renderer it replaced (generate_wiki_markup_legacy),
+over long-career players.
+
+    python benchmarks/bench_render.py [--players N] [--seasons N] [--repeat N]
+"""
+import argparse
+import sys
+import time
+
+import corpus
+from afl_scraper import parse_player_stats
+from baselines import generate_wiki_markup_legacy
+from wikipedia_updater import generate_wiki_markup
+
+
+def long_careers(players, seasons):
+    """to_json() payloads for synthetic players with seasons-3 .. seasons seasons."""
+    careers = []
+    for seed in range(players):
+        html = corpus.build_profile_html(seed, seasons=seasons - seed % 4, first_year=2024 - seasons)
+        careers.append((f"synthetic-{seed}", parse_player_stats(html).to_json()))
+    return careers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=40)
+    parser.add_argument("--seasons", type=int, default=22)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    careers = long_careers(args.players, args.seasons)
+
+    mismatches = [name for name, data in careers
+                  if generate_wiki_markup(data, "Test_Player", "https://afltables.com/")
+                  != generate_wiki_markup_legacy(data, "Test_Player", "https://afltables.com/")]
+    for name in mismatches:
+        print(f"MISMATCH {name}")
+    print(f"parity: {len(careers) - len(mismatches)}/{len(careers)} players identical")
+    if mismatches:
+        sys.exit(1)
+
+    total = len(careers) * args.repeat
+    results = {}
+    for name, render in (("legacy", generate_wiki_markup_legacy), ("indexed", generate_wiki_markup)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for _, data in careers:
+                render(data, "Test_Player", "https://afltables.com/")
+        results[name] = time.perf_counter() - start
+        print(f"{name:>7}: {results[name] * 1e6 / total:8.1f} us/player  {total / results[name]:9.1f} players/s")
+    print(f"speedup: {results['legacy'] / results['indexed']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Offline benchmark suite: times every stage of a player update separately
+over the synthetic corpus (the hand-written edge cases in
+benchmarks/fixtures/afltables and benchmarks/fixtures/wikipedia, topped up
+with generated players) and reports players/s and peak traced memory per
+stage. Nothing touches the network: profile pages are served from the
+corpus and each player's article is its fixture or generated wikitext.
+
+    python benchmarks/bench_stages.py [--players N] [--repeat N]
+                                      [--save results.json] [--compare results.json] [--tolerance 1.25]
+
+--save writes the results as JSON; --compare reads such a file and exits 1
+when any stage runs slower than the saved run by more than --tolerance.
+"""
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+import corpus
+from afl_scraper import (convert_dataframes_to_json, extract_tables_data, get_player_dob, parse_player_stats,
+                         parse_season_index)
+from baselines import apply_special_formatting, extract_special_formatting
+from wikipedia_updater import (generate_wiki_markup, process_player_stats,
+                               update_or_insert_statistics_section_in_wikitext)
+from wikitable import apply_cell_formatting, extract_cell_formatting
+
+BASE_URL = "https://afltables.com/afl/stats/"
+
+
+class CorpusFetcher:
+    """Stands in for FetchEngine: serves corpus pages by URL."""
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def fetch(self, url):
+        return self.pages.get(url)
+
+
+def build_stages(players):
+    """[(stage name, call, inputs, players per input)] with each stage's inputs taken from the one before."""
+    links = [f"players/{name[0].upper()}/{name}.html" for name, _, _ in players]
+    urls = [BASE_URL + link for link in links]
+    fetcher = CorpusFetcher({url: html for url, (_, html, _) in zip(urls, players)})
+    index_html = corpus.build_season_index_html(2024, links)
+
+    frames = [extract_tables_data(url, fetcher=fetcher) for url in urls]
+    soups = [BeautifulSoup(html, "html.parser") for _, html, _ in players]
+    processed = [process_player_stats(stats_df, averages_df) for stats_df, averages_df, _ in frames]
+    payloads = [convert_dataframes_to_json(*dataframes) for dataframes in processed]
+    markups = [generate_wiki_markup(payload, name, url)
+               for payload, (name, _, _), url in zip(payloads, players, urls)]
+    merges = [(article, markup) for (_, _, article), markup in zip(players, markups)]
+
+    return [
+        ("parse_season_index", lambda html: parse_season_index(html, BASE_URL), [index_html], len(players)),
+        ("extract_tables_data", lambda url: extract_tables_data(url, fetcher=fetcher), urls, 1),
+        ("parse_player_stats", lambda url: parse_player_stats(fetcher.fetch(url), url), urls, 1),
+        ("get_player_dob", get_player_dob, soups, 1),
+        ("process_player_stats", lambda frame: process_player_stats(frame[0], frame[1]), frames, 1),
+        ("convert_dataframes_to_json", lambda dataframes: convert_dataframes_to_json(*dataframes), processed, 1),
+        ("generate_wiki_markup", lambda job: generate_wiki_markup(*job),
+         [(payload, name, url) for payload, (name, _, _), url in zip(payloads, players, urls)], 1),
+        ("special_formatting (legacy)",
+         lambda job: apply_special_formatting(job[1], extract_special_formatting(job[0])), merges, 1),
+        ("cell_formatting", lambda job: apply_cell_formatting(job[1], extract_cell_formatting(job[0])), merges, 1),
+        ("update_or_insert_statistics_section",
+         lambda job: update_or_insert_statistics_section_in_wikitext(*job), merges, 1),
+    ]
+
+
+def measure(call, inputs, players_per_input, repeat):
+    """
+    (players/s, peak KiB) for one stage. Throughput comes from the fastest of
+    `repeat` passes so saved runs compare without scheduler noise; memory is
+    traced in a separate pass so it doesn't skew timing.
+    """
+    for item in inputs:
+        call(item)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in inputs:
+            call(item)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    for item in inputs:
+        call(item)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return len(inputs) * players_per_input / best, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--players", type=int, default=40, help="generated players on top of the fixture ones")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to check against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="allowed slowdown factor per stage")
+    args = parser.parse_args()
+
+    players = corpus.player_corpus(args.players)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["stages"]
+
+    print(f"{len(players)} players, best of {args.repeat} passes per stage")
+    print(f"{'stage':<38}{'players/s':>12}{'peak KiB':>11}")
+    results = {}
+    regressions = []
+    for name, call, inputs, players_per_input in build_stages(players):
+        rate, peak = measure(call, inputs, players_per_input, args.repeat)
+        results[name] = {"players_per_s": rate, "peak_kib": peak}
+        line = f"{name:<38}{rate:12.1f}{peak:11.1f}"
+        if name in baseline:
+            slowdown = baseline[name]["players_per_s"] / rate
+            line += f"  {slowdown:5.2f}x of saved time"
+            if slowdown > args.tolerance:
+                regressions.append(name)
+                line += "  SLOWER"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"players": len(players), "repeat": args.repeat, "stages": results}, f, indent=2)
+    if regressions:
+        print(f"regressed beyond {args.tolerance}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
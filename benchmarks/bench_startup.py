@@ -0,0 +1,83 @@
+"""
+Startup and login benchmark. Each measurement runs in a fresh interpreter:
+the time to import afl_scraper (and the heavy modules that import pulled in,
+which must not include pywikibot or pandas), and with --login the time
+initialize_apis() takes in two consecutive processes and for a second run
+within one process.
+
+    python benchmarks/bench_startup.py [--repeat N] [--login]
+
+--login needs the .env and pywikibot setup of a real run: the first process
+logs in from the saved cookies (or with the password if there are none),
+the second should only need one request to check the saved session, and a
+second run in the same process none at all.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import corpus
+
+# Modules afl_scraper should only import once a run actually needs them
+LAZY_MODULES = ("pywikibot", "pandas")
+
+IMPORT_CHILD = """
+import json, sys, time
+sys.path.insert(0, {repo!r})
+start = time.perf_counter()
+import afl_scraper
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import": elapsed, "loaded": [name for name in {lazy!r} if name in sys.modules]}}))
+"""
+
+LOGIN_CHILD = """
+import json, sys, time
+sys.path.insert(0, {repo!r})
+from wikipedia_updater import initialize_apis
+timings = []
+for _ in range(2):
+    start = time.perf_counter()
+    site = initialize_apis()
+    timings.append(time.perf_counter() - start)
+print(json.dumps({{"runs": timings, "logged_in": site is not None and site.logged_in()}}))
+"""
+
+
+def run_child(source, cwd):
+    # The scraper logs to scraper.log in the working directory, so children run in a scratch one
+    result = subprocess.run([sys.executable, "-c", source], cwd=cwd, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        sys.exit(result.returncode)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--login", action="store_true", help="also time logging in to Wikipedia (needs credentials)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        imports = [run_child(IMPORT_CHILD.format(repo=corpus.REPO_DIR, lazy=LAZY_MODULES), scratch)
+                   for _ in range(args.repeat)]
+        loaded = sorted({name for result in imports for name in result["loaded"]})
+        print(f"import afl_scraper: {statistics.median(r['import'] for r in imports) * 1000:8.1f} ms (median of {args.repeat})")
+        print(f"lazy modules loaded at import: {', '.join(loaded) or 'none'}")
+
+        if args.login:
+            for process in ("first process", "second process"):
+                result = run_child(LOGIN_CHILD.format(repo=corpus.REPO_DIR), scratch)
+                first, again = result["runs"]
+                print(f"login, {process:>14}: {first * 1000:8.1f} ms, next run in the same process {again * 1000:6.1f} ms"
+                      + ("" if result["logged_in"] else "  (NOT logged in)"))
+
+    if loaded:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark for carrying Statistics table formatting over to new markup: the
+single-pass wikitable tokenizer (extract_cell_formatting ->
+apply_cell_formatting) against the line-regex functions it replaced
+(extract_special_formatting -> apply_special_formatting).
+
+Every article is built from generated markup decorated with leader cells,
+a premiership season and {{efn}} notes, under a paragraph of career prose
+per season. The new path must reproduce the
+decorated table exactly when re-applied to the undecorated markup; the old
+path is only timed and compared for information.
+
+The tokenizer is a correctness fix, not a speedup: it runs at roughly the
+speed of the regex functions on typical articles and slower on dense ones,
+since it splits every formatted row into cells to keep columns aligned
+where the regex path counts separators and shifts leader cells by one.
+
+    python benchmarks/bench_wikitable.py [--pages N] [--repeat N]
+"""
+import argparse
+import sys
+import time
+
+import corpus
+from afl_scraper import parse_player_stats
+from baselines import apply_special_formatting, extract_special_formatting
+from wikipedia_updater import generate_wiki_markup
+from wikitable import apply_cell_formatting, extract_cell_formatting
+
+
+def regex_path(old_wikitext, new_markup):
+    special_formatting = extract_special_formatting(old_wikitext)
+    return apply_special_formatting(new_markup, special_formatting) if special_formatting else new_markup
+
+
+def tokenizer_path(old_wikitext, new_markup):
+    return apply_cell_formatting(new_markup, extract_cell_formatting(old_wikitext))
+
+
+def build_cases(pages, leader_share):
+    cases = []
+    for seed, (name, html) in enumerate(corpus.profile_corpus(pages)):
+        stats = parse_player_stats(html)
+        if stats is None:
+            continue
+        markup = generate_wiki_markup(stats.to_json(), "Test_Player", "https://afltables.com/")
+        decorated = corpus.decorate_statistics(markup, seed, leader_share)
+        # Longer careers come with longer articles: one paragraph of prose per season
+        article = corpus.build_article_wikitext("Test_Player", decorated, career_paragraphs=len(stats.seasons))
+        cases.append((name, article, markup, decorated))
+    return cases
+
+
+def run(label, cases, repeat):
+    mismatches = [name for name, article, markup, decorated in cases
+                  if tokenizer_path(article, markup) != decorated]
+    for name in mismatches:
+        print(f"MISMATCH {name}")
+    print(f"[{label}] round trip: {len(cases) - len(mismatches)}/{len(cases)} tables restored exactly")
+    same = sum(1 for _, article, markup, _ in cases if regex_path(article, markup) == tokenizer_path(article, markup))
+    print(f"[{label}] regex path identical on {same}/{len(cases)} tables (it shifts leader cells by one column)")
+
+    total = len(cases) * repeat
+    results = {}
+    for name, merge in (("regex", regex_path), ("tokenizer", tokenizer_path)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, article, markup, _ in cases:
+                merge(article, markup)
+        results[name] = time.perf_counter() - start
+        print(f"{name:>9}: {results[name] * 1000 / total:8.3f} ms/article  {total / results[name]:9.1f} articles/s")
+    print(f"speedup: {results['regex'] / results['tokenizer']:.1f}x")
+    return not mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # Typical articles mark a few league-leading seasons; "dense" marks every one
+    ok = True
+    for label, leader_share in (("typical", 0.2), ("dense", 1.0)):
+        ok &= run(label, build_cases(args.pages, leader_share), args.repeat)
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
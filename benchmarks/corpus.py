@@ -0,0 +1,240 @@
+"""
+Offline corpus for the benchmarks. It is entirely synthetic: no page in it
+was recorded from afltables.com or Wikipedia.
+
+The hand-written edge-case pages under benchmarks/fixtures/ (profiles in
+afltables/, their articles in wikipedia/) are used as-is. On top of those
+the corpus generates AFL Tables profile and season index pages with the
+same markup the scrapers read (simpleTabsContent tabs, sortable tables,
+Totals/Averages footers, a "Born:" line), so every benchmark runs without
+network access.
+"""
+import glob
+import os
+import random
+import sys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURES_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+PROFILE_COLUMNS = [
+    "Year", "Team", "#", "GM", "W-D-L", "KI", "MK", "HB", "DI", "GL", "BH", "HO", "TK", "RB",
+    "IF", "CL", "CG", "FF", "FA", "BR", "CP", "UP", "CM", "MI", "1%", "BO", "GA", "%P", "SU"
+]
+# Columns that afltables leaves blank for seasons before they were recorded
+LATE_RECORDED_COLUMNS = {"HB", "DI", "TK", "HO", "RB", "IF", "CL", "CG", "FF", "FA", "BR",
+                         "CP", "UP", "CM", "MI", "1%", "BO", "GA", "%P", "SU"}
+TEAMS = ["Carlton", "Collingwood", "Essendon", "Geelong", "Hawthorn", "Richmond", "St Kilda", "Sydney"]
+
+
+def _season_row(rng, year, team, number, blank_late_columns):
+    games = rng.randint(1, 25)
+    values = {"Year": year, "Team": team, "#": number, "GM": games,
+              "W-D-L": f"{games // 2}-0-{games - games // 2}"}
+    for column in PROFILE_COLUMNS[5:]:
+        if blank_late_columns and column in LATE_RECORDED_COLUMNS:
+            values[column] = ""
+        elif column == "BR":
+            values[column] = rng.choice(["", "", 1, 3, 6, 12])
+        elif column == "%P":
+            values[column] = rng.randint(60, 95)
+        else:
+            values[column] = rng.randint(0, 25) * games // 5
+    return values
+
+
+def _table_html(title, rows, totals, averages, decimals):
+    head = "".join(
+        f'<th><a href="#" title="{c}">{c}</a></th>' if c not in ("Year", "Team") else f"<th>{c}</th>"
+        for c in PROFILE_COLUMNS
+    )
+    body = []
+    for row in rows:
+        cells = [f'<td><a href="../seas/{row["Year"]}.html">{row["Year"]}</a></td>',
+                 f'<td><a href="../teams/{row["Team"].lower()}.html">{row["Team"]}</a></td>']
+        for column in PROFILE_COLUMNS[2:]:
+            value = row[column]
+            if decimals and isinstance(value, int) and column not in ("#", "GM", "%P"):
+                value = f"{value / max(row['GM'], 1):.1f}"
+            cells.append(f"<td>{value}</td>")
+        body.append("<tr>" + "".join(cells) + "</tr>")
+    foot = "".join(
+        "<tr><td colspan=3>" + label + "</td>" + "".join(f"<td>{v}</td>" for v in values) + "</tr>"
+        for label, values in (("Totals", totals), ("Averages", averages))
+    )
+    return (
+        '<div class="simpleTabsContent">'
+        f'<table class="sortable" width="100%"><caption>{title}</caption>'
+        f"<thead><tr>{head}</tr></thead>\n<tbody>\n" + "\n".join(body) + "\n</tbody>\n"
+        f"<tfoot>{foot}</tfoot></table></div>\n"
+    )
+
+
+def build_profile_html(seed, seasons=10, first_year=2010, born="4-Dec-1995", blank_early_seasons=0):
+    """Deterministic AFL Tables style player profile page."""
+    rng = random.Random(seed)
+    team = rng.choice(TEAMS)
+    rows = []
+    for offset in range(seasons):
+        if rng.random() < 0.1:
+            team = rng.choice(TEAMS)
+        rows.append(_season_row(rng, str(first_year + offset), team, rng.randint(1, 45),
+                                offset < blank_early_seasons))
+
+    stat_columns = PROFILE_COLUMNS[3:]
+    totals, averages = [], []
+    total_games = sum(row["GM"] for row in rows)
+    for column in stat_columns:
+        if column == "W-D-L":
+            totals.append("")
+            averages.append("")
+            continue
+        numbers = [row[column] for row in rows if isinstance(row[column], int)]
+        total = sum(numbers)
+        totals.append(f"{total}b" if column == "BH" else str(total))
+        averages.append(f"{total / max(total_games, 1):.2f}" if column != "GM" else "")
+
+    born_html = f"<b>Born:</b>{born} <i>(28y 10m 13d)</i><br>" if born else ""
+    return (
+        "<html><head><title>AFL Tables - Player</title></head><body>\n"
+        f"<center><h1>Player {seed}</h1>{born_html}<b>Height:</b>190 cm<br></center>\n"
+        '<div class="simpleTabs"><ul class="simpleTabsNavigation">'
+        "<li><a href='#'>Totals</a></li><li><a href='#'>Averages</a></li></ul>\n"
+        + _table_html("Season totals", rows, totals, averages, decimals=False)
+        + _table_html("Season averages", rows, totals, averages, decimals=True)
+        + "</div></body></html>\n"
+    )
+
+
+def fixture_pages(kind):
+    """Yields (name, text) for every fixture file under benchmarks/fixtures/<kind>/."""
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, kind, "*"))):
+        with open(path, "r", encoding="utf-8") as f:
+            yield os.path.basename(path), f.read()
+
+
+def profile_corpus(count=40):
+    """Fixture profile pages followed by `count` generated ones of varying career length."""
+    pages = list(fixture_pages("afltables"))
+    for seed in range(count):
+        seasons = 1 + (seed * 7) % 22
+        pages.append((f"synthetic-{seed}-{seasons}y", build_profile_html(seed, seasons=seasons)))
+    return pages
+
+
+def decorate_statistics(markup, seed, leader_share=1.0):
+    """
+    Adds the hand-made formatting editors put on statistics tables: a premiership
+    season (bgcolor=F0E68C, bold, <sup>#</sup>), league-leading stats
+    (bgcolor=CAE1FF, bold, <sup>†</sup>) on `leader_share` of the seasons and an
+    {{efn}} note on a season.
+    """
+    rng = random.Random(seed)
+    lines = markup.split("\n")
+    season_lines = [i for i, line in enumerate(lines) if line.startswith("| [[")]
+    for n, i in enumerate(season_lines):
+        cells = lines[i][2:].split(" || ")
+        if n == 0 and len(season_lines) > 2:
+            cells[0] = f"bgcolor=F0E68C | '''{cells[0]}'''<sup>#</sup>"
+        elif rng.random() < 0.2:
+            cells[0] += "{{efn|Played for two clubs during the season.}}"
+        leaders = rng.sample(range(3, len(cells) - 1), k=2) if rng.random() < leader_share else []
+        for column in leaders:
+            cells[column] = f"bgcolor=CAE1FF | '''{cells[column]}'''<sup>†</sup>"
+        lines[i] = "| " + " || ".join(cells)
+    return "\n".join(lines)
+
+
+CAREER_PARAGRAPH = (
+    "In [[{year} AFL season|{year}]] he played {games} games and kicked {goals} goals, including a "
+    "career-best haul against [[Geelong Football Club|Geelong]] at the [[Melbourne Cricket Ground|MCG]]."
+    "<ref>{{{{cite news|url=https://www.afl.com.au/news/{year}|title=Round report|work=AFL.com.au"
+    "|date=12 May {year}|access-date=1 March 2024}}}}</ref> He polled votes in the "
+    "[[Brownlow Medal]] and finished top five in the club best and fairest.<ref name=bnf{year}/>\n\n"
+)
+
+
+def build_article_wikitext(player_name, statistics_markup, career_paragraphs=0):
+    """A Wikipedia article around an existing statistics section, with an optional season-by-season career."""
+    career = "".join(
+        CAREER_PARAGRAPH.format(year=2000 + n, games=10 + n % 12, goals=n * 3 % 40) for n in range(career_paragraphs)
+    )
+    return (
+        "{{Use dmy dates|date=March 2024}}\n"
+        "{{Infobox AFL biography\n| name = " + player_name.replace("_", " ") + "\n| club = Carlton\n}}\n"
+        f"'''{player_name.replace('_', ' ')}''' is an [[Australian rules football]]er who plays for the "
+        "[[Carlton Football Club]] in the [[Australian Football League]] (AFL).\n\n"
+        "==Early life==\nGrew up playing junior football in Western Australia.\n\n"
+        "==AFL career==\nWas drafted with a first round selection.\n\n" + career
+        + statistics_markup
+        + "'''Notes'''\n{{notelist}}\n\n"
+        "==References==\n{{Reflist}}\n\n"
+        "==External links==\n* {{AFL Tables|" + player_name + "}}\n\n"
+        "[[Category:Carlton Football Club players]]\n"
+    )
+
+
+def build_season_index_html(year, profile_links):
+    """
+    AFL Tables season stats page listing profile_links (relative, e.g.
+    players/A/Adam_Cerra.html): one sortable table per team with a title row,
+    a header row and a row per player.
+    """
+    tables = []
+    per_team = max(1, -(-len(profile_links) // len(TEAMS)))
+    for t, team in enumerate(TEAMS):
+        links = profile_links[t * per_team:(t + 1) * per_team]
+        if not links:
+            break
+        rows = "".join(
+            f'<tr><td>{n + 1}</td><td><a href="{link}">{link.rsplit("/", 1)[-1][:-5].replace("_", ", ", 1)}</a></td>'
+            + "".join(f"<td>{(n * 7 + c) % 30}</td>" for c in range(24)) + "</tr>\n"
+            for n, link in enumerate(links)
+        )
+        tables.append(
+            f'<table class="sortable" width="100%"><thead><tr><th colspan=26>{team} [Game by Game]</th></tr>\n'
+            f'<tr><th>#</th><th>Player</th>' + "".join(f"<th>{c}</th>" for c in PROFILE_COLUMNS[3:27]) + "</tr></thead>\n"
+            f"<tbody>\n{rows}</tbody></table><br>\n"
+        )
+    return (
+        f"<html><head><title>AFL Tables - {year} Player Stats</title></head><body>\n"
+        f"<center><h1>{year} Player Stats</h1></center>\n" + "".join(tables) + "</body></html>\n"
+    )
+
+
+def _previous_season_article(name, html, seed):
+    # Imported here so corpus.py stays importable for benchmarks that only need HTML
+    from afl_scraper import parse_player_stats
+    from wikipedia_updater import generate_wiki_markup
+
+    stats = parse_player_stats(html)
+    data = stats.to_json()
+    if len(data["stats_df"]) < 2:
+        return build_article_wikitext(name, "")
+    last_season = data["stats_df"][-1]["Season"]
+    previous = dict(data,
+                    stats_df=data["stats_df"][:-1],
+                    averages_df=[a for a in data["averages_df"] if a["Season"] != last_season])
+    markup = generate_wiki_markup(previous, name, f"https://afltables.com/afl/stats/players/{name}.html")
+    return build_article_wikitext(name, decorate_statistics(markup, seed, leader_share=0.2),
+                                  career_paragraphs=len(stats.seasons))
+
+
+def player_corpus(count=40):
+    """
+    (name, profile_html, article_wikitext) for every page of profile_corpus.
+    Pages with a fixtures/wikipedia/<name>.wiki use it as their article; the
+    rest get a synthetic one whose Statistics table stops a season short, like
+    an article due for its end-of-season update.
+    """
+    articles = {os.path.splitext(name)[0]: text for name, text in fixture_pages("wikipedia")}
+    players = []
+    for seed, (name, html) in enumerate(profile_corpus(count)):
+        key = os.path.splitext(name)[0]
+        article = articles.get(key) or _previous_season_article(key, html, seed)
+        players.append((key, html, article))
+    return players
@@ -0,0 +1,60 @@
+import concurrent.futures
+import logging
+import multiprocessing
+import os
+
+
+class CpuPool:
+    """
+    Runs CPU-bound steps (profile parsing, markup rendering and the Statistics
+    merge) in worker processes so they scale past the GIL, while fetches and
+    wiki requests stay on the calling threads.
+
+    run(fn, *args) blocks the calling thread until a worker returns, so the
+    pipeline's scrape and publish threads use it like a plain call. fn must be
+    a module-level function; only its arguments (raw HTML, to_json() payloads,
+    page text) and its compact result cross the process boundary. With
+    processes=0 everything runs inline in the calling thread, as before.
+
+    Workers are started with "spawn" so they never inherit the fetch engine's
+    event loop thread or any held locks.
+    """
+
+    def __init__(self, processes=None):
+        if processes is None:
+            processes = os.cpu_count() or 1
+        self.processes = processes
+        self.executor = None
+        if processes > 0:
+            self.executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logging.info(f"Parsing and rendering in {processes} worker processes")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def run(self, fn, *args):
+        if self.executor is None:
+            return fn(*args)
+        return self.executor.submit(fn, *args).result()
+
+    def map(self, fn, items, chunksize=8):
+        """Results of fn(item) for every item, in order, spread over the workers in chunks."""
+        if self.executor is None:
+            return map(fn, items)
+        return self.executor.map(fn, items, chunksize=chunksize)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+
+def run_cpu(pool, fn, *args):
+    """pool.run(fn, *args), or fn(*args) when there is no pool."""
+    return pool.run(fn, *args) if pool is not None else fn(*args)
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+
+import schedule
+
+from afl_fetcher import FetchEngine
+
+DEFAULT_STATE_PATH = os.path.join("player_data", "daemon_state.json")
+
+# Settings read from the --config JSON file; command line flags override them
+DAEMON_DEFAULTS = {
+    "years": None,              # "2024", "2010-2024", "all"; None follows the current season
+    "threads": 10,
+    "processes": None,          # None: PARSE_PROCESSES from the environment, else 0
+    "poll_minutes": 15,
+    "quiet_hours": None,        # "22-7" or "22:30-06:00", local time; no runs start inside
+    "max_runs_per_day": 4,
+    "time_limit_minutes": None, # runs stopped by it resume at the next poll
+    "incremental": True,
+    "archive": True,
+    "metrics_port": None
+}
+
+
+def load_daemon_config(path=None, overrides=None):
+    """DAEMON_DEFAULTS, updated from the JSON file at path, then from the non-None overrides."""
+    config = dict(DAEMON_DEFAULTS)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            from_file = json.load(f)
+        unknown = set(from_file) - set(DAEMON_DEFAULTS)
+        if unknown:
+            logging.warning(f"Ignoring unknown settings in {path}: {', '.join(sorted(unknown))}")
+        config.update({key: value for key, value in from_file.items() if key in DAEMON_DEFAULTS})
+    config.update({key: value for key, value in (overrides or {}).items() if value is not None})
+    return config
+
+
+def parse_quiet_hours(text):
+    """'22-7' or '22:30-06:00' -> (start, end) in minutes after midnight, or None for no quiet hours."""
+    if not text:
+        return None
+
+    def minutes(part):
+        hours, _, mins = part.strip().partition(":")
+        value = int(hours) * 60 + int(mins or 0)
+        if not 0 <= value < 24 * 60:
+            raise ValueError(f"Invalid time {part!r} in quiet hours {text!r}")
+        return value
+
+    start, end = text.split("-", 1)
+    return minutes(start), minutes(end)
+
+
+def in_quiet_hours(quiet_hours, now):
+    if quiet_hours is None:
+        return False
+    start, end = quiet_hours
+    current = now.hour * 60 + now.minute
+    if start <= end:
+        return start <= current < end
+    # Wraps past midnight, e.g. 22:00-07:00
+    return current >= start or current < end
+
+
+class ChangeTriggeredScheduler:
+    """
+    Non-interactive replacement for the every-N-days scheduler. Every
+    poll_minutes it asks for the newest season index with a conditional
+    request (ETag / Last-Modified through the ResponseCache, falling back to
+    the body checksum) and calls run() only when the page differs from the
+    one the last successful run was started for. Nothing runs inside
+    quiet_hours or once max_runs_per_day runs have started today; the day's
+    count survives restarts in state_path.
+    """
+
+    def __init__(self, run, index_url, cache, poll_minutes=15, quiet_hours=None, max_runs_per_day=4,
+                 state_path=DEFAULT_STATE_PATH):
+        self.run = run
+        self.index_url = index_url
+        self.cache = cache
+        self.poll_minutes = poll_minutes
+        self.quiet_hours = quiet_hours
+        self.max_runs_per_day = max_runs_per_day
+        self.state_path = state_path
+
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, state):
+        directory = os.path.dirname(self.state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def runs_today(self, now=None):
+        state = self._load_state()
+        today = (now or datetime.now()).date().isoformat()
+        return state.get("runs", 0) if state.get("date") == today else 0
+
+    def _count_run(self, now):
+        self._save_state({"date": now.date().isoformat(), "runs": self.runs_today(now) + 1,
+                          "last_run": now.isoformat(timespec="seconds")})
+
+    def poll(self):
+        """One check of the season index; returns True if it started a run."""
+        now = datetime.now()
+        if in_quiet_hours(self.quiet_hours, now):
+            logging.debug("Quiet hours - not polling")
+            return False
+        if self.max_runs_per_day and self.runs_today(now) >= self.max_runs_per_day:
+            logging.debug(f"Already ran {self.max_runs_per_day} times today - not polling")
+            return False
+
+        url = self.index_url()
+        with FetchEngine(per_host_limit=1, cache=self.cache) as engine:
+            body, changed = engine.fetch_with_status(url)
+        if body is None:
+            logging.warning(f"Could not poll {url}")
+            return False
+        if not changed:
+            logging.info(f"{url} unchanged since the last run")
+            return False
+
+        # The version this run is for; if the page changes again mid-run the next poll picks that up
+        polled_hash = self.cache.load(url)["sha256"]
+        logging.info(f"{url} changed - starting a run")
+        self._count_run(now)
+        try:
+            succeeded = self.run() is not False
+        except Exception as e:
+            logging.error(f"Error in daemon run: {str(e)}")
+            succeeded = False
+        if succeeded:
+            self.cache.mark_processed(url, polled_hash)
+        else:
+            logging.error("Run failed - it will be retried at the next poll")
+        return True
+
+    def run_forever(self):
+        logging.info(f"Polling the season index every {self.poll_minutes} minutes"
+                     + (f", at most {self.max_runs_per_day} runs a day" if self.max_runs_per_day else ""))
+        self.poll()
+        schedule.every(self.poll_minutes).minutes.do(self.poll)
+        while True:
+            try:
+                schedule.run_pending()
+                time.sleep(30)
+            except KeyboardInterrupt:
+                logging.info("Daemon stopped by user")
+                return
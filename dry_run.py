@@ -0,0 +1,160 @@
+import difflib
+import json
+import logging
+import os
+import re
+import threading
+
+from player_state import PlayerTracker
+
+# Characters not allowed in output file names on common filesystems
+UNSAFE_FILENAME_RE = re.compile(r'[\\/:*?"<>|]')
+
+
+def wikitext_filename(player_name):
+    return UNSAFE_FILENAME_RE.sub("_", player_name) + ".wiki"
+
+
+def _write_text(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+
+
+def write_page_diff(output_dir, player_name, title, original, updated):
+    """Writes <player>.wiki and <player>.diff to output_dir; returns the number of changed lines."""
+    name = wikitext_filename(player_name)[:-len(".wiki")]
+    diff = "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), updated.splitlines(keepends=True),
+        fromfile=f"a/{title}", tofile=f"b/{title}"
+    ))
+    _write_text(os.path.join(output_dir, name + ".wiki"), updated)
+    _write_text(os.path.join(output_dir, name + ".diff"), diff)
+    return sum(1 for line in diff.splitlines() if line[:1] in "+-" and not line.startswith(("+++", "---")))
+
+
+def write_diff_index(output_dir, results):
+    """index.json: {player: {"title", "lines_changed"}} for every page that would have been edited."""
+    _write_text(os.path.join(output_dir, "index.json"), json.dumps(dict(sorted(results.items())), indent=2))
+
+
+class DryRunPage:
+    """
+    Stands in for a pywikibot.Page in dry runs: text is the locally supplied
+    wikitext and save() writes the new wikitext and a unified diff against the
+    original to the output directory instead of editing Wikipedia.
+    """
+
+    def __init__(self, dry_run, player_name, title, text):
+        self.dry_run = dry_run
+        self.player_name = player_name
+        self._title = title
+        self.original = text
+        self.text = text
+
+    def title(self):
+        return self._title
+
+    def save(self, summary=None, **kwargs):
+        self.dry_run.record(self.player_name, self._title, self.original, self.text)
+
+
+class DryRunFetcher:
+    """
+    Wraps a FetchEngine so dry runs read afltables pages from the response
+    cache without a request where one is cached, always treat them as changed,
+    and never mark anything processed in the real cache.
+    """
+
+    def __init__(self, fetcher, cache=None):
+        self.fetcher = fetcher
+        self.cache = cache
+
+    def _cached(self, url):
+        if self.cache is None or self.cache.load(url) is None:
+            return None
+        return self.cache.read_body(url)
+
+    def prefetch(self, urls):
+        self.fetcher.prefetch([url for url in urls if self._cached(url) is None])
+
+    def fetch_with_status(self, url, timeout=None):
+        body = self._cached(url)
+        if body is None:
+            body = self.fetcher.fetch(url, timeout)
+        return body, True
+
+    def fetch(self, url, timeout=None):
+        return self.fetch_with_status(url, timeout)[0]
+
+    def mark_processed(self, url):
+        pass
+
+
+class DryRun:
+    """
+    Everything a dry run swaps out: pages come from <wikitext_dir>/<player>.wiki
+    (falling back to a read-only load through `preloader`, which is then
+    cached in wikitext_dir), saves land in output_dir as <player>.wiki and
+    <player>.diff, and resume state goes to a scratch tracker so the real one
+    is left untouched.
+    """
+
+    def __init__(self, output_dir, wikitext_dir=None, preloader=None):
+        self.output_dir = output_dir
+        self.wikitext_dir = wikitext_dir or os.path.join(output_dir, "wikitext")
+        self.preloader = preloader
+        self.lock = threading.Lock()
+        self.results = {}
+        os.makedirs(self.output_dir, exist_ok=True)
+        os.makedirs(self.wikitext_dir, exist_ok=True)
+
+    def open_tracker(self):
+        path = os.path.join(self.output_dir, "dry_run_state.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        return PlayerTracker(db_path=path)
+
+    def _read(self, path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    # PagePreloader interface used by update_wikipedia_page and run_scraper
+
+    def expect(self, player_names):
+        if self.preloader is not None:
+            self.preloader.expect([name for name in player_names
+                                   if not os.path.exists(os.path.join(self.wikitext_dir, wikitext_filename(name)))])
+
+    def discard(self, player_name):
+        if self.preloader is not None:
+            self.preloader.discard(player_name)
+
+    def get(self, player_name):
+        path = os.path.join(self.wikitext_dir, wikitext_filename(player_name))
+        text = self._read(path)
+        title = player_name.replace("_", " ")
+        if text is None:
+            if self.preloader is None:
+                logging.warning(f"No local wikitext for {player_name} at {path}")
+                return None
+            page = self.preloader.get(player_name)
+            if page is None:
+                return None
+            text, title = page.text, page.title()
+            _write_text(path, text)
+        return DryRunPage(self, player_name, title, text)
+
+    def record(self, player_name, title, original, updated):
+        lines_changed = write_page_diff(self.output_dir, player_name, title, original, updated)
+        with self.lock:
+            self.results[player_name] = {"title": title, "lines_changed": lines_changed}
+
+    def write_report(self):
+        with self.lock:
+            results = dict(self.results)
+        write_diff_index(self.output_dir, results)
+        logging.info(f"Dry run: {len(results)} pages would be edited, diffs in {self.output_dir}")
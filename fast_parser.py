@@ -0,0 +1,108 @@
+import lxml.etree
+import lxml.html
+
+# Same selection as the BeautifulSoup backend in afl_scraper.extract_profile_tables,
+# expressed as XPath so libxml2 does the tree walking in C.
+TAB_TABLES_XPATH = (
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' simpleTabsContent ')]"
+    "/descendant::table[contains(concat(' ', normalize-space(@class), ' '), ' sortable ')][1]"
+)
+DOB_XPATH = "(//text()[contains(., 'Born:')])[1]/following::text()[1]"
+
+
+def _first_descendant(element, tag):
+    return next(element.iter(tag), None)
+
+
+def _cell_text(cell):
+    link = _first_descendant(cell, 'a')
+    return link.text_content() if link is not None else cell.text_content().strip()
+
+
+def extract_profile_tables_lxml(html_content):
+    """
+    lxml backend for afl_scraper.parse_player_page. Parses the profile once and
+    returns ([(headers, rows, footer_rows), ...], dob), identical to
+    afl_scraper.extract_profile_tables.
+    """
+    root = lxml.html.document_fromstring(html_content)
+    tabs = []
+
+    for table in root.xpath(TAB_TABLES_XPATH):
+        thead = _first_descendant(table, 'thead')
+        if thead is None:
+            raise ValueError("Stats table has no <thead>")
+        headers = [_cell_text(th) for th in thead.iter('th')]
+
+        rows = []
+        tbody = _first_descendant(table, 'tbody')
+        if tbody is not None:
+            for tr in tbody.iter('tr'):
+                rows.append([_cell_text(td) for td in tr.iter('td')])
+
+        footer_rows = []
+        tfoot = _first_descendant(table, 'tfoot')
+        if tfoot is not None:
+            for tr in tfoot.iter('tr'):
+                footer_rows.append([td.text_content().strip() for td in tr.iter('td')])
+
+        tabs.append((headers, rows, footer_rows))
+
+    dob = None
+    if tabs:
+        dob_text = root.xpath(DOB_XPATH)
+        if dob_text:
+            dob = dob_text[0].strip().split('(')[0].strip()
+    return tabs, dob
+
+
+def _element_text(element):
+    # Pull-parser elements are plain etree elements, without lxml.html's text_content()
+    return "".join(element.itertext()).strip()
+
+
+def iter_index_rows_lxml(html_content, columns, chunk_size=1 << 14):
+    """
+    Streams the player rows of an AFL Tables season stats page. Yields
+    (club, profile_href, values) for every player row of every sortable table
+    as soon as libxml2 has parsed it, where values holds the text of each of
+    `columns` (matched against the header row, None where absent). The page is
+    fed to the parser chunk by chunk, so the first players come out long
+    before the whole page is parsed.
+    """
+    parser = lxml.etree.HTMLPullParser(events=("start", "end"), tag=("table", "tr"))
+    state = {"sortable": False, "club": None, "positions": [None] * len(columns)}
+
+    def rows():
+        for event, element in parser.read_events():
+            if element.tag == 'table':
+                if event == "start":
+                    state["sortable"] = 'sortable' in (element.get('class') or '').split()
+                    state["club"] = None
+                    state["positions"] = [None] * len(columns)
+                else:
+                    state["sortable"] = False
+                continue
+            if event != "end" or element.tag != 'tr' or not state["sortable"]:
+                continue
+            cells = [child for child in element if child.tag in ('td', 'th')]
+            if cells and all(cell.tag == 'th' for cell in cells):
+                headers = [_element_text(cell) for cell in cells]
+                if "Player" in headers:
+                    state["positions"] = [headers.index(c) if c in headers else None for c in columns]
+                elif len(headers) == 1:
+                    # Title row, e.g. "Adelaide [Game by Game]"
+                    state["club"] = headers[0].split('[')[0].strip()
+            elif len(cells) > 1:
+                link = _first_descendant(cells[1], 'a')
+                if link is not None and link.get('href'):
+                    values = [_element_text(cells[i]) if i is not None and i < len(cells) else None
+                              for i in state["positions"]]
+                    yield state["club"], link.get('href'), values
+            element.clear()
+
+    for offset in range(0, len(html_content), chunk_size):
+        parser.feed(html_content[offset:offset + chunk_size])
+        yield from rows()
+    parser.close()
+    yield from rows()
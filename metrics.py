@@ -0,0 +1,185 @@
+import bisect
+import contextlib
+import http.server
+import json
+import logging
+import os
+import threading
+import time
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Counters every run reports, even when they stay at zero
+STANDARD_COUNTERS = ("fetched", "skipped", "edited", "unchanged", "no_article", "failed", "retried")
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus layout."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.maximum = max(self.maximum, seconds)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (the maximum for the +Inf bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+
+class Metrics:
+    """
+    Per-stage latency histograms, event counters and gauges (queue depths)
+    shared by every worker thread. Rendered as Prometheus text exposition
+    (to_prometheus / write_prometheus / serve) and as an end-of-run JSON
+    summary (summary / write_summary).
+    """
+
+    def __init__(self, prefix="afl_scraper"):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.histograms = {}
+            self.counters = dict.fromkeys(STANDARD_COUNTERS, 0)
+            self.gauges = {}
+            self.gauge_peaks = {}
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @contextlib.contextmanager
+    def timer(self, stage):
+        """Times the with-block into the stage's histogram, whether or not it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        with self.lock:
+            self.gauges[name] = value
+            self.gauge_peaks[name] = max(self.gauge_peaks.get(name, value), value)
+
+    def add_gauge(self, name, delta):
+        with self.lock:
+            value = self.gauges.get(name, 0) + delta
+            self.gauges[name] = value
+            self.gauge_peaks[name] = max(self.gauge_peaks.get(name, value), value)
+
+    def to_prometheus(self):
+        p = self.prefix
+        with self.lock:
+            lines = [f"# HELP {p}_stage_seconds Time spent per player in each processing stage",
+                     f"# TYPE {p}_stage_seconds histogram"]
+            for stage, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+                lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {h.total:.6f}')
+                lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {h.count}')
+            lines += [f"# HELP {p}_players_total Players by outcome",
+                      f"# TYPE {p}_players_total counter"]
+            lines += [f'{p}_players_total{{event="{name}"}} {value}' for name, value in sorted(self.counters.items())]
+            lines += [f"# HELP {p}_queue_depth Items waiting in each queue",
+                      f"# TYPE {p}_queue_depth gauge"]
+            lines += [f'{p}_queue_depth{{queue="{name}"}} {value}' for name, value in sorted(self.gauges.items())]
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        with self.lock:
+            return {
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "counters": dict(self.counters),
+                "stages": {
+                    stage: {
+                        "count": h.count,
+                        "total_seconds": round(h.total, 6),
+                        "mean_seconds": round(h.total / h.count, 6) if h.count else 0.0,
+                        "p50_seconds": round(h.quantile(0.5), 6),
+                        "p95_seconds": round(h.quantile(0.95), 6),
+                        "max_seconds": round(h.maximum, 6)
+                    }
+                    for stage, h in sorted(self.histograms.items())
+                },
+                "queues": {name: {"last": value, "peak": self.gauge_peaks[name]}
+                           for name, value in sorted(self.gauges.items())}
+            }
+
+    def write_prometheus(self, path):
+        """Writes the exposition text atomically, e.g. for node_exporter's textfile collector."""
+        self._write(path, self.to_prometheus())
+
+    def write_summary(self, path):
+        self._write(path, json.dumps(self.summary(), indent=2))
+
+    def _write(self, path, text):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"Error writing metrics to {path}: {str(e)}")
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serves the Prometheus text on http://host:port/metrics from a daemon thread."""
+        metrics = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return server
+
+
+# Shared by every worker in the process, like the rate limiters
+METRICS = Metrics()
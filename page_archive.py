@@ -0,0 +1,120 @@
+import hashlib
+import logging
+import lzma
+import os
+import sqlite3
+import threading
+import time
+
+try:
+    import zstandard
+    ARCHIVE_CODEC = "zst"
+except ImportError:
+    zstandard = None
+    ARCHIVE_CODEC = "xz"
+
+DEFAULT_ARCHIVE_DIR = os.path.join("player_data", "archive")
+
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    title TEXT,
+    source TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, key, sha256)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_latest ON pages(kind, key, fetched_at);
+"""
+
+
+def _compress(data, codec):
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return lzma.compress(data, preset=6)
+
+
+def _decompress(data, codec):
+    if codec == "zst":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return lzma.decompress(data)
+
+
+def object_path(directory, sha256, codec):
+    return os.path.join(directory, "objects", sha256[:2], f"{sha256}.{codec}")
+
+
+def read_object(directory, sha256):
+    """Text of an archived body, or None. Module-level so replay workers can read without a PageArchive."""
+    for codec in ("zst", "xz"):
+        path = object_path(directory, sha256, codec)
+        if not os.path.exists(path):
+            continue
+        if codec == "zst" and zstandard is None:
+            logging.error(f"{path} needs the zstandard package to read")
+            return None
+        with open(path, "rb") as f:
+            return _decompress(f.read(), codec).decode("utf-8")
+    return None
+
+
+class PageArchive:
+    """
+    Compressed, content-addressed store of the raw pages a run has read:
+    profile HTML keyed by url ("profile") and article wikitext keyed by player
+    name ("wikitext"). Each distinct body is stored once under
+    objects/<aa>/<sha256>.<codec> (zstd when the zstandard package is
+    installed, xz otherwise) and index.db records which content every key had
+    and when, so replay can rerun the transform and merge without the network.
+    """
+
+    def __init__(self, directory=DEFAULT_ARCHIVE_DIR):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, "objects"), exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.db"), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ARCHIVE_SCHEMA)
+        self.conn.commit()
+
+    def put(self, kind, key, text, title=None, source=None):
+        """Archives text as the current content of (kind, key) and returns its sha256."""
+        data = text.encode("utf-8")
+        sha256 = hashlib.sha256(data).hexdigest()
+        path = object_path(self.directory, sha256, ARCHIVE_CODEC)
+        try:
+            if not any(os.path.exists(object_path(self.directory, sha256, codec)) for codec in ("zst", "xz")):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(_compress(data, ARCHIVE_CODEC))
+                os.replace(tmp_path, path)
+            with self.lock:
+                self.conn.execute(
+                    "INSERT INTO pages (kind, key, sha256, title, source, fetched_at) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(kind, key, sha256) DO UPDATE SET fetched_at = excluded.fetched_at, "
+                    "title = COALESCE(excluded.title, pages.title), source = COALESCE(excluded.source, pages.source)",
+                    (kind, key, sha256, title, source, time.time())
+                )
+                self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logging.error(f"Error archiving {kind} {key}: {str(e)}")
+        return sha256
+
+    def read(self, sha256):
+        return read_object(self.directory, sha256)
+
+    def latest(self, kind):
+        """{key: (sha256, title, source)} for the most recently seen content of every key of kind."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT key, sha256, title, source FROM pages WHERE kind = ? ORDER BY fetched_at",
+                (kind,)
+            ).fetchall()
+        return {key: (sha256, title, source) for key, sha256, title, source in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,123 @@
+import logging
+import queue
+import threading
+import time
+
+from metrics import METRICS
+from work_queue import run_work_queue
+
+
+class Pipeline:
+    """
+    Two worker pools joined by a bounded queue: scrape(item) returns a payload
+    (None: nothing to publish, False: failed) that the wiki pool publishes.
+    """
+
+    def __init__(self, scrape, publish, scrape_workers=8, publish_workers=4, queue_size=64,
+                 work_stealing=False, adaptive=False, on_enqueue=None, time_limit=None):
+        self.scrape = scrape
+        self.publish = publish
+        self.scrape_workers = scrape_workers
+        self.publish_workers = publish_workers
+        self.work_stealing = work_stealing
+        self.adaptive = adaptive
+        self.on_enqueue = on_enqueue
+        self.time_limit = time_limit
+        self.queue_size = queue_size
+        self.payloads = queue.Queue(maxsize=queue_size)
+        self.stopping = threading.Event()
+        self.error = None
+        self.unscraped = 0
+        self.count_lock = threading.Lock()
+
+    def stop(self):
+        self.stopping.set()
+
+    def _scrape_item(self, item):
+        METRICS.add_gauge("scrape_pending", -1)
+        if self.stopping.is_set():
+            with self.count_lock:
+                self.unscraped += 1
+            return True
+        payload = self.scrape(item)
+        if payload is False:
+            return False
+        if payload is None:
+            return True
+        if self.on_enqueue is not None:
+            self.on_enqueue(payload)
+        with METRICS.timer("queue_wait"):
+            self.payloads.put(payload)
+        METRICS.set_gauge("publish_pending", self.payloads.qsize())
+        return True
+
+    def _publish_worker(self):
+        while True:
+            payload = self.payloads.get()
+            METRICS.set_gauge("publish_pending", self.payloads.qsize())
+            try:
+                if payload is None:
+                    return
+                self.publish(payload)
+            except Exception as e:
+                logging.error(f"Publish worker error: {str(e)}")
+            finally:
+                self.payloads.task_done()
+
+    def _scrape_stage(self, items):
+        try:
+            run_work_queue(items, self._scrape_item, self.scrape_workers,
+                           work_stealing=self.work_stealing, adaptive=self.adaptive, lookahead=self.queue_size)
+        except Exception as e:
+            self.error = e
+
+    def _count_pending(self, items):
+        for item in items:
+            METRICS.add_gauge("scrape_pending", 1)
+            yield item
+
+    def run(self, items):
+        """items is a list, or an iterator that is scraped from while it is still producing."""
+        if isinstance(items, (list, tuple)):
+            METRICS.set_gauge("scrape_pending", len(items))
+        else:
+            METRICS.set_gauge("scrape_pending", 0)
+            items = self._count_pending(items)
+        publishers = [
+            threading.Thread(target=self._publish_worker, name=f"publish-{i}", daemon=True)
+            for i in range(self.publish_workers)
+        ]
+        for thread in publishers:
+            thread.start()
+        scraper = threading.Thread(
+            target=self._scrape_stage,
+            args=(items,),
+            name="scrape-stage",
+            daemon=True
+        )
+        scraper.start()
+        deadline = None if self.time_limit is None else time.monotonic() + self.time_limit
+        try:
+            # Joined in slices so Ctrl+C reaches this thread while scraping runs
+            while scraper.is_alive():
+                scraper.join(0.5)
+                if deadline is not None and time.monotonic() >= deadline and not self.stopping.is_set():
+                    logging.error(f"Time limit of {self.time_limit:.0f} seconds reached - "
+                                  f"finishing payloads already scraped")
+                    self.stop()
+        except KeyboardInterrupt:
+            logging.info("Interrupted - finishing payloads already scraped")
+            self.stop()
+            scraper.join()
+            raise
+        finally:
+            # One sentinel per publisher, queued behind every real payload
+            for _ in publishers:
+                self.payloads.put(None)
+            for thread in publishers:
+                thread.join()
+            if self.unscraped:
+                logging.error(f"Stopped with {self.unscraped} items left unscraped")
+        logging.info("Pipeline drained")
+        if self.error is not None:
+            raise self.error
@@ -0,0 +1,142 @@
+from typing import NamedTuple
+
+# AFL Tables profile column -> key used in json_output / generate_wiki_markup
+WEBSITE_COLUMNS_MAPPING = {
+    "Year": "Season",
+    "Team": "Team",
+    "#": "No.",
+    "GM": "Games",
+    "GL": "G",
+    "BH": "B",
+    "KI": "K",
+    "HB": "H",
+    "DI": "D",
+    "MK": "M",
+    "TK": "T",
+    "BR": "Votes"
+}
+STAT_COLUMNS = ("GM", "GL", "BH", "KI", "HB", "DI", "MK", "TK")
+STAT_KEYS = tuple(WEBSITE_COLUMNS_MAPPING[column] for column in STAT_COLUMNS)
+# Position of each STAT_COLUMNS entry (and BR) in the Totals/Averages footer rows
+FOOTER_INDICES = (1, 7, 8, 3, 5, 6, 4, 10)
+FOOTER_VOTES_INDEX = 17
+
+
+def _value(v):
+    return 0 if v == "" else v
+
+
+class SeasonRow(NamedTuple):
+    season: str
+    team: str
+    number: object
+    stats: tuple
+
+    def to_dict(self):
+        row = {"Season": self.season, "Team": self.team, "No.": self.number}
+        row.update(zip(STAT_KEYS, self.stats))
+        return row
+
+
+class AverageRow(NamedTuple):
+    season: str
+    team: str
+    number: object
+    stats: tuple
+
+    def to_dict(self):
+        row = {"Season": self.season, "Team": self.team, "No.": self.number}
+        row.update(zip(STAT_KEYS, self.stats))
+        return row
+
+
+class CareerTotals(NamedTuple):
+    totals: tuple
+    averages: tuple
+
+    def to_records(self):
+        return [dict(zip(STAT_KEYS, self.totals)), dict(zip(STAT_KEYS, self.averages))]
+
+
+class Votes(NamedTuple):
+    by_season: dict
+    total: int
+
+    def to_records(self):
+        record = dict(self.by_season)
+        record["Total Votes"] = self.total
+        return [record]
+
+
+class PlayerStats(NamedTuple):
+    """
+    Everything generate_wiki_markup needs for one player, built directly from
+    the raw profile tables without going through pandas.
+    """
+    seasons: tuple
+    averages: tuple
+    career: CareerTotals
+    votes: Votes
+    dob: object = None
+
+    @classmethod
+    def from_tabs(cls, tabs, dob=None):
+        """
+        Builds the model from the (headers, rows, footer_rows) tabs returned by the
+        profile parsers. Mirrors build_tab_dataframe + process_player_stats: the
+        first tab holds season totals, the second season averages.
+        """
+        if len(tabs) != 2:
+            raise ValueError(f"Expected totals and averages tabs, found {len(tabs)}")
+        (total_headers, total_rows, total_footer), (avg_headers, avg_rows, avg_footer) = tabs
+
+        seasons, votes_values = [], []
+        for row in _select_rows(total_headers, total_rows):
+            season, team, number = row[0], row[1], row[2]
+            seasons.append(SeasonRow(_value(season), _value(team), _value(number),
+                                     tuple(_value(v) for v in row[3:11])))
+            votes_values.append((season, 0 if row[11] == "" else int(row[11])))
+
+        averages = tuple(
+            AverageRow(_value(row[0]), _value(row[1]), _value(row[2]), tuple(_value(v) for v in row[3:11]))
+            for row in _select_rows(avg_headers, avg_rows)
+        )
+
+        totals_row, averages_row = _footer_rows(total_footer)
+        _footer_rows(avg_footer)
+
+        by_season = dict(votes_values)
+        return cls(
+            seasons=tuple(seasons),
+            averages=averages,
+            career=CareerTotals(
+                totals=tuple(_value(totals_row[i].replace('b', '').strip()) for i in FOOTER_INDICES),
+                averages=tuple(_value(averages_row[i].strip()) for i in FOOTER_INDICES)
+            ),
+            votes=Votes(by_season=by_season, total=sum(v for _, v in votes_values)),
+            dob=dob
+        )
+
+    def to_json(self):
+        """Same structure as convert_dataframes_to_json."""
+        return {
+            "stats_df": [row.to_dict() for row in self.seasons],
+            "averages_df": [row.to_dict() for row in self.averages],
+            "votes_df": self.votes.to_records(),
+            "total_career_df": self.career.to_records()
+        }
+
+
+def _select_rows(headers, rows):
+    """Yields each row reduced to the WEBSITE_COLUMNS_MAPPING columns, in that order."""
+    indices = [headers.index(column) for column in WEBSITE_COLUMNS_MAPPING]
+    for row in rows:
+        if len(row) != len(headers):
+            raise ValueError(f"Row has {len(row)} cells, expected {len(headers)}")
+        yield [row[i] for i in indices]
+
+
+def _footer_rows(footer_rows):
+    if len(footer_rows) < 2 or min(len(row) for row in footer_rows[:2]) <= FOOTER_VOTES_INDEX:
+        raise ValueError("Totals/Averages footer is incomplete")
+    return footer_rows[0], footer_rows[1]
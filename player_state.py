@@ -0,0 +1,426 @@
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from urllib.parse import unquote
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_name TEXT PRIMARY KEY,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    failure_reason TEXT,
+    fingerprint TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_players_status ON players(status);
+CREATE TABLE IF NOT EXISTS run_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS season_totals (
+    player_name TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    totals TEXT NOT NULL,
+    PRIMARY KEY (player_name, season)
+);
+"""
+
+# The title cache has its own file: PlayerTracker keeps a write transaction
+# open between batched commits, which would lock out a second connection
+TITLE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wiki_titles (
+    player_name TEXT PRIMARY KEY,
+    title TEXT,
+    source TEXT NOT NULL,
+    resolved_at REAL NOT NULL
+);
+"""
+
+DEFAULT_DB_PATH = os.path.join("player_data", "tracker.db")
+DEFAULT_TITLES_DB_PATH = os.path.join("player_data", "titles.db")
+
+# Pre-SQLite tracker files, imported once when the database is first created
+LEGACY_TRACKER_FILE = "player_tracker.json"
+LEGACY_PROCESSED_FILE = "processed_players.json"
+LEGACY_FAILED_FILE = "failed.csv"
+LEGACY_FINGERPRINTS_FILE = os.path.join("player_data", "stats_fingerprints.json")
+
+
+def _connect(db_path, schema=SCHEMA):
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(schema)
+    return conn
+
+
+class PlayerTracker:
+    """
+    Resume state for scraper runs, kept in a SQLite database in WAL mode.
+
+    Every worker shares one connection behind a lock. Status updates are
+    committed in batches of commit_every writes, so per-player bookkeeping is
+    a single indexed upsert, and a crash can only lose the last uncommitted
+    batch, never corrupt the state.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, commit_every=25):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        self.pending_writes = 0
+        self.lock = threading.RLock()
+        self.load_tracker()
+
+    def load_tracker(self):
+        is_new = not os.path.exists(self.db_path)
+        self.conn = _connect(self.db_path)
+        if is_new:
+            self._import_legacy_files()
+        self.conn.commit()
+
+        self.processed_players = self._names_with_status("processed")
+        self.failed_players = self._names_with_status("failed")
+
+    def _names_with_status(self, status):
+        rows = self.conn.execute("SELECT player_name FROM players WHERE status = ?", (status,))
+        return {row[0] for row in rows}
+
+    def _import_legacy_files(self):
+        imported = []
+        try:
+            if os.path.exists(LEGACY_PROCESSED_FILE):
+                with open(LEGACY_PROCESSED_FILE, 'r') as f:
+                    for player_name in json.load(f):
+                        self._upsert(player_name, status="processed")
+                # The JSON file only held players of a run that hadn't finished
+                self._set_state("run_in_progress", 1)
+                imported.append(LEGACY_PROCESSED_FILE)
+            if os.path.exists(LEGACY_FAILED_FILE):
+                with open(LEGACY_FAILED_FILE, 'r', newline='') as f:
+                    for row in csv.DictReader(f):
+                        self._upsert(row['Player Name'], status="failed")
+                imported.append(LEGACY_FAILED_FILE)
+            if os.path.exists(LEGACY_FINGERPRINTS_FILE):
+                with open(LEGACY_FINGERPRINTS_FILE, 'r') as f:
+                    for player_name, fingerprint in json.load(f).items():
+                        self._upsert(player_name, fingerprint=fingerprint)
+                imported.append(LEGACY_FINGERPRINTS_FILE)
+            if os.path.exists(LEGACY_TRACKER_FILE):
+                with open(LEGACY_TRACKER_FILE, 'r') as f:
+                    self._set_state("total_players", json.load(f).get("total_players", 0))
+                imported.append(LEGACY_TRACKER_FILE)
+            if imported:
+                logging.info(f"Imported legacy tracker files into the state database: {', '.join(imported)}")
+        except Exception as e:
+            logging.error(f"Error importing legacy tracker files: {str(e)}")
+
+    def _upsert(self, player_name, status=None, failure_reason=None, fingerprint=None, attempts_delta=0):
+        self.conn.execute(
+            """
+            INSERT INTO players (player_name, status, attempts, failure_reason, fingerprint, updated_at)
+            VALUES (:name, COALESCE(:status, 'pending'), :attempts, :reason, :fingerprint, :now)
+            ON CONFLICT(player_name) DO UPDATE SET
+                status = COALESCE(:status, players.status),
+                attempts = players.attempts + :attempts,
+                failure_reason = COALESCE(:reason, players.failure_reason),
+                fingerprint = COALESCE(:fingerprint, players.fingerprint),
+                updated_at = :now
+            """,
+            {
+                "name": player_name,
+                "status": status,
+                "attempts": attempts_delta,
+                "reason": failure_reason,
+                "fingerprint": fingerprint,
+                "now": datetime.now().isoformat(timespec='seconds')
+            }
+        )
+
+    def _set_state(self, key, value):
+        self.conn.execute(
+            "INSERT INTO run_state (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def _write(self, *args, **kwargs):
+        """Upsert under the lock and commit once a full batch has accumulated."""
+        with self.lock:
+            self._upsert(*args, **kwargs)
+            self.pending_writes += 1
+            if self.pending_writes >= self.commit_every:
+                self.flush()
+
+    def flush(self):
+        with self.lock:
+            try:
+                self.conn.commit()
+                self.pending_writes = 0
+            except sqlite3.Error as e:
+                logging.error(f"Error committing tracker state: {str(e)}")
+
+    def close(self):
+        with self.lock:
+            self.flush()
+            self.conn.close()
+
+    @property
+    def total_players(self):
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM run_state WHERE key = 'total_players'").fetchone()
+        return row[0] if row else 0
+
+    @property
+    def processed_count(self):
+        return len(self.processed_players)
+
+    def set_total_players(self, total):
+        with self.lock:
+            self._set_state("total_players", total)
+            self.flush()
+
+    def reset_tracker(self):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE players SET status = 'pending', attempts = 0, failure_reason = NULL "
+                "WHERE status != 'pending'"
+            )
+            self.processed_players = set()
+            self.failed_players = set()
+            self.flush()
+
+    def start_run(self):
+        """
+        Marks a run as started. Returns True if the last run was interrupted, in
+        which case its processed players are kept for the new run to skip;
+        otherwise the run starts from clean processed and failed lists.
+        """
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM run_state WHERE key = 'run_in_progress'").fetchone()
+            interrupted = bool(row and row[0])
+            if not interrupted:
+                self.reset_tracker()
+            self._set_state("run_in_progress", 1)
+            self.flush()
+        return interrupted
+
+    def finish_run(self):
+        with self.lock:
+            self._set_state("run_in_progress", 0)
+            self.flush()
+
+    def clear_failed(self):
+        with self.lock:
+            self.conn.execute("UPDATE players SET status = 'pending' WHERE status = 'failed'")
+            self.failed_players = set()
+            self.flush()
+
+    def get_fingerprint(self, player_name):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fingerprint FROM players WHERE player_name = ?", (player_name,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_fingerprint(self, player_name, fingerprint):
+        self._write(player_name, fingerprint=fingerprint)
+
+    def get_season_totals(self, seasons):
+        """{(player_name, season): totals} stored for the given seasons."""
+        seasons = list(seasons)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT player_name, season, totals FROM season_totals "
+                f"WHERE season IN ({','.join('?' * len(seasons))})",
+                seasons
+            ).fetchall()
+        return {(player_name, season): totals for player_name, season, totals in rows}
+
+    def set_season_totals(self, player_name, totals_by_season):
+        """Remembers the season index totals a player was last processed with."""
+        if not totals_by_season:
+            return
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO season_totals (player_name, season, totals) VALUES (?, ?, ?) "
+                "ON CONFLICT(player_name, season) DO UPDATE SET totals = excluded.totals",
+                [(player_name, season, totals) for season, totals in totals_by_season.items()]
+            )
+            self.pending_writes += 1
+            if self.pending_writes >= self.commit_every:
+                self.flush()
+
+    def record_attempt(self, player_name, failure_reason=None):
+        self._write(player_name, failure_reason=failure_reason, attempts_delta=1)
+
+    def add_processed_player(self, player_name):
+        if player_name in self.processed_players:
+            return
+        with self.lock:
+            self.processed_players.add(player_name)
+            self.failed_players.discard(player_name)
+            self._write(player_name, status="processed")
+
+    def add_failed_player(self, player_name, failure_reason=None):
+        with self.lock:
+            if player_name in self.failed_players:
+                return
+            self.failed_players.add(player_name)
+            self._write(player_name, status="failed", failure_reason=failure_reason)
+        logging.error(f"Added {player_name} to failed players list after multiple retries")
+
+
+class TitleCache:
+    """
+    Persistent AFL Tables slug -> Wikipedia title mapping.
+
+    A NULL title records that the player has no article. Those negative entries
+    expire after negative_ttl seconds so new articles are eventually found;
+    resolved titles are kept until they stop matching, and entries with
+    source 'override' never expire and are never replaced by resolution.
+    """
+
+    def __init__(self, db_path=DEFAULT_TITLES_DB_PATH, negative_ttl=7 * 24 * 3600, tracker_db_path=DEFAULT_DB_PATH):
+        self.negative_ttl = negative_ttl
+        self.lock = threading.Lock()
+        is_new = not os.path.exists(db_path)
+        self.conn = _connect(db_path, TITLE_SCHEMA)
+        if is_new:
+            self._import_tracker_titles(tracker_db_path)
+
+    def _import_tracker_titles(self, tracker_db_path):
+        """Copies the titles older versions kept in the tracker database."""
+        if not tracker_db_path or not os.path.exists(tracker_db_path):
+            return
+        try:
+            self.conn.execute("ATTACH DATABASE ? AS tracker", (tracker_db_path,))
+            try:
+                if self.conn.execute(
+                    "SELECT 1 FROM tracker.sqlite_master WHERE type = 'table' AND name = 'wiki_titles'"
+                ).fetchone():
+                    count = self.conn.execute(
+                        "INSERT OR IGNORE INTO wiki_titles SELECT player_name, title, source, resolved_at "
+                        "FROM tracker.wiki_titles"
+                    ).rowcount
+                    self.conn.commit()
+                    if count:
+                        logging.info(f"Moved {count} cached titles from {tracker_db_path}")
+            finally:
+                self.conn.execute("DETACH DATABASE tracker")
+        except sqlite3.Error as e:
+            logging.error(f"Error importing cached titles from {tracker_db_path}: {str(e)}")
+
+    def lookup(self, player_name):
+        """
+        Returns (title, source) for a cached player, or None on a miss or an
+        expired negative entry. title None means 'known to have no article'.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT title, source, resolved_at FROM wiki_titles WHERE player_name = ?", (player_name,)
+            ).fetchone()
+        if row is None:
+            return None
+        title, source, resolved_at = row
+        if title is None and source != "override" and time.time() - resolved_at > self.negative_ttl:
+            return None
+        return title, source
+
+    def store(self, player_name, title, source="resolved"):
+        with self.lock:
+            self._store(player_name, title, source)
+            self.conn.commit()
+
+    def store_many(self, mapping, source="resolved"):
+        with self.lock:
+            for player_name, title in mapping.items():
+                self._store(player_name, title, source)
+            self.conn.commit()
+
+    def _store(self, player_name, title, source):
+        replace_override = "" if source == "override" else "WHERE wiki_titles.source != 'override'"
+        self.conn.execute(
+            "INSERT INTO wiki_titles (player_name, title, source, resolved_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(player_name) DO UPDATE SET title = excluded.title, source = excluded.source, "
+            "resolved_at = excluded.resolved_at " + replace_override,
+            (player_name, title, source, time.time())
+        )
+
+    def invalidate(self, player_name):
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM wiki_titles WHERE player_name = ? AND source != 'override'", (player_name,)
+            )
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _slug_from_afltables_id(value):
+    """'players/P/Patrick_Cripps.html', 'P/Patrick_Cripps' or a full url -> 'Patrick_Cripps'."""
+    return value.strip().rstrip("/").split("/")[-1].replace(".html", "")
+
+
+def _title_from_article(value):
+    """Article title or https://en.wikipedia.org/wiki/... url -> page title ('' = no article)."""
+    value = value.strip()
+    if "/wiki/" in value:
+        value = unquote(value.split("/wiki/", 1)[1])
+    return value.replace("_", " ")
+
+
+def read_title_mapping(path):
+    """
+    Reads a slug -> title mapping from JSON ({slug: title}) or CSV. CSV files,
+    e.g. a Wikidata query export, need an AFL Tables id column (slug,
+    afltables_id or afltablesid) and a title column (title or article). An
+    empty title maps the player to 'no article'.
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".json"):
+            return {_slug_from_afltables_id(k): (_title_from_article(v) if v else None) for k, v in json.load(f).items()}
+
+        mapping = {}
+        reader = csv.DictReader(f)
+        id_column = next(c for c in reader.fieldnames if c.lower() in ("slug", "afltables_id", "afltablesid"))
+        title_column = next(c for c in reader.fieldnames if c.lower() in ("title", "article"))
+        for row in reader:
+            if row[id_column]:
+                title = _title_from_article(row[title_column] or "")
+                mapping[_slug_from_afltables_id(row[id_column])] = title or None
+        return mapping
+
+
+def import_title_mapping(path, override=False, db_path=DEFAULT_TITLES_DB_PATH):
+    mapping = read_title_mapping(path)
+    cache = TitleCache(db_path)
+    try:
+        cache.store_many(mapping, source="override" if override else "import")
+    finally:
+        cache.close()
+    logging.info(f"Imported {len(mapping)} title mappings from {path}")
+    return len(mapping)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser(description="Manage the scraper's persistent state")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import-titles", help="bulk-load AFL Tables slug -> Wikipedia title mappings")
+    import_parser.add_argument("path", help="JSON or CSV mapping file (e.g. a Wikidata export)")
+    import_parser.add_argument("--override", action="store_true", help="store as manual overrides that never expire")
+    args = parser.parse_args()
+
+    if args.command == "import-titles":
+        import_title_mapping(args.path, override=args.override)
@@ -0,0 +1,98 @@
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by every worker that talks to one upstream.
+
+    reserve() takes a token immediately and returns how long the caller must
+    wait for it, so blocking threads (acquire) and coroutines (acquire_async)
+    can share the same bucket. pause() stops the whole bucket, e.g. for a
+    Retry-After or maxlag response seen by any one worker: no tokens accrue
+    while it lasts, and reservations made meanwhile queue up behind its end
+    at the normal rate instead of all waking when it is over.
+    """
+
+    def __init__(self, name, rate, capacity=1):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def configure(self, rate=None, capacity=None):
+        with self.lock:
+            if rate is not None:
+                self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+                self.tokens = min(self.tokens, capacity)
+
+    def _refill(self, now):
+        # updated runs ahead of now during a pause, so nothing accrues until it ends
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self):
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            ready_at = self.updated + (-self.tokens / self.rate if self.tokens < 0 else 0.0)
+            return max(0.0, ready_at - now)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds, reason=""):
+        with self.lock:
+            now = time.monotonic()
+            until = now + seconds
+            if until > self.paused_until:
+                self._refill(now)
+                self.paused_until = until
+                self.updated = max(self.updated, until)
+                logging.warning(f"Pausing {self.name} requests for {seconds:.1f}s {reason}".rstrip())
+
+
+def backoff_delay(attempt, base=2.0, cap=120.0):
+    """Exponential backoff with full jitter for the given 0-based retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value, default=None):
+    """Retry-After header (delta-seconds or HTTP-date) -> seconds to wait."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+# Shared by every worker in the process. afltables.com is fetched through
+# FetchEngine, Wikipedia edits through update_wikipedia_page; pywikibot's own
+# put_throttle is turned off in initialize_apis so WIKI_EDIT_LIMITER is the only
+# edit throttle.
+AFLTABLES_LIMITER = TokenBucket("afltables.com", rate=8.0, capacity=16)
+WIKI_EDIT_LIMITER = TokenBucket("Wikipedia edit", rate=0.1, capacity=1)
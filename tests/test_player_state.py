@@ -0,0 +1,77 @@
+import sqlite3
+
+import pytest
+
+from player_state import PlayerTracker, TitleCache
+
+
+@pytest.fixture(autouse=True)
+def scratch_dir(tmp_path, monkeypatch):
+    # The tracker imports legacy files relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_title_cache_writes_while_tracker_batch_is_open(scratch_dir):
+    tracker = PlayerTracker(str(scratch_dir / "tracker.db"), commit_every=25)
+    cache = TitleCache(str(scratch_dir / "titles.db"), tracker_db_path=str(scratch_dir / "tracker.db"))
+    try:
+        # Leaves the tracker's write transaction open until the batch fills
+        tracker.set_fingerprint("smith-john", "abc")
+        assert tracker.pending_writes == 1
+
+        cache.store_many({"smith-john": "John Smith (footballer)", "jones-tom": None})
+        cache.invalidate("jones-tom")
+        tracker.add_processed_player("smith-john")
+
+        assert cache.lookup("smith-john") == ("John Smith (footballer)", "resolved")
+        assert cache.lookup("jones-tom") is None
+    finally:
+        cache.close()
+        tracker.close()
+
+    tracker = PlayerTracker(str(scratch_dir / "tracker.db"))
+    try:
+        assert tracker.get_fingerprint("smith-john") == "abc"
+        assert "smith-john" in tracker.processed_players
+    finally:
+        tracker.close()
+
+
+def test_title_cache_moves_titles_from_the_tracker_database(scratch_dir):
+    conn = sqlite3.connect(str(scratch_dir / "tracker.db"))
+    conn.execute("CREATE TABLE wiki_titles (player_name TEXT PRIMARY KEY, title TEXT, "
+                 "source TEXT NOT NULL, resolved_at REAL NOT NULL)")
+    conn.execute("INSERT INTO wiki_titles VALUES ('smith-john', 'John Smith (footballer)', 'override', 0)")
+    conn.commit()
+    conn.close()
+
+    cache = TitleCache(str(scratch_dir / "titles.db"), tracker_db_path=str(scratch_dir / "tracker.db"))
+    try:
+        assert cache.lookup("smith-john") == ("John Smith (footballer)", "override")
+    finally:
+        cache.close()
+
+
+def test_only_an_interrupted_run_keeps_its_processed_players(scratch_dir):
+    path = str(scratch_dir / "tracker.db")
+    tracker = PlayerTracker(path)
+    assert tracker.start_run() is False
+    tracker.add_processed_player("smith-john")
+    tracker.add_failed_player("jones-tom")
+    tracker.close()
+
+    # The run never called finish_run
+    tracker = PlayerTracker(path)
+    assert tracker.start_run() is True
+    assert tracker.processed_players == {"smith-john"}
+    tracker.finish_run()
+    tracker.close()
+
+    tracker = PlayerTracker(path)
+    try:
+        assert tracker.start_run() is False
+        assert tracker.processed_players == set()
+        assert tracker.failed_players == set()
+    finally:
+        tracker.close()
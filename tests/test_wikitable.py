@@ -0,0 +1,96 @@
+from wikipedia_updater import merge_statistics_section
+from wikitable import CellChange, StatsTable, merge_statistics_table
+
+ARTICLE_HEAD = "'''Test Player''' is an Australian rules footballer.\n\n"
+ARTICLE_TAIL = "\n==References==\n{{reflist}}\n"
+
+
+def season_row(season, team, stats):
+    """One generated season row: No., 8 season totals, 7 averages and votes."""
+    cells = [f"[[{season} AFL season|{season}]]", team] + [str(value) for value in stats]
+    return "|-\n| " + " || ".join(cells) + "\n"
+
+
+def statistics(rows, end_year, access_date="1 January 2025", career=None):
+    parts = [
+        "==Statistics==\n"
+        f"''Updated to the end of the {end_year} season''."
+        "<ref>{{cite web|url=https://afltables.com/|title=Test Player|publisher=AFL Tables|"
+        f"access-date={access_date}}}}}</ref>\n\n",
+        "{{AFL player statistics legend|p=y}}\n{{AFL player statistics start with votes}}\n",
+    ]
+    parts.extend(season_row(*row) for row in rows)
+    parts.append("|-\n! colspan=3| Career\n")
+    parts.extend(f"! {value}\n" for value in career or [0] * 16)
+    parts.append("|}\n\n")
+    return "".join(parts)
+
+
+def article(rows, end_year, **kwargs):
+    return ARTICLE_HEAD + statistics(rows, end_year, **kwargs) + ARTICLE_TAIL
+
+
+def stats(number, games, goals, votes=0):
+    return [number, games, goals, 1, 2, 3, 4, 5, 6, 0.5, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, votes]
+
+
+def season_values(wikitext):
+    """{(season, club): cell values} of every season row in wikitext."""
+    table = StatsTable(wikitext[wikitext.index("==Statistics=="):])
+    return {(row.season, row.cells()[1].value): [cell.value for cell in row.cells()[2:]]
+            for row in table.rows if row.season is not None}
+
+
+def test_new_season_is_inserted_after_the_last_season_row():
+    old = article([("2023", "Geelong", stats(12, 20, 15))], 2023)
+    new = statistics([("2023", "Geelong", stats(12, 20, 15)), ("2024", "Geelong", stats(12, 22, 30))], 2024)
+
+    merged, changes = merge_statistics_table(old, new)
+
+    assert merged.index("[[2023 AFL season") < merged.index("[[2024 AFL season") < merged.index("Career")
+    assert "Updated to the end of the 2024 season" in merged
+    assert season_values(merged)[("2024", "Geelong")] == [str(value) for value in stats(12, 22, 30)]
+    assert CellChange("2024", 0, "Games", None, "22") in changes
+    assert all(change.season == "2024" and change.old is None for change in changes)
+    assert merged.startswith(ARTICLE_HEAD) and merged.endswith(ARTICLE_TAIL)
+
+
+def test_traded_season_is_paired_by_club_not_by_order():
+    old = article([("2024", "[[St Kilda Football Club|St Kilda]]", stats(9, 5, 2)),
+                   ("2024", "Geelong", stats(31, 3, 1))], 2024)
+    # AFL Tables lists the clubs the other way round, with a game added to each
+    new = statistics([("2024", "Geelong", stats(31, 4, 1)), ("2024", "St Kilda", stats(9, 6, 2))], 2024)
+
+    merged, changes = merge_statistics_table(old, new)
+
+    values = season_values(merged)
+    assert values[("2024", "[[St Kilda Football Club|St Kilda]]")][:3] == ["9", "6", "2"]
+    assert values[("2024", "Geelong")][:3] == ["31", "4", "1"]
+    # Occurrences count the rows of the new table: Geelong first
+    assert sorted((change.occurrence, change.old, change.new) for change in changes) == [(0, "3", "4"), (1, "5", "6")]
+
+
+def test_traded_season_with_unmatched_club_names_is_not_merged():
+    old = article([("2024", "{{AFL StK}}", stats(9, 5, 2)), ("2024", "{{AFL Gee}}", stats(31, 3, 1))], 2024)
+    new = statistics([("2024", "Geelong", stats(31, 4, 1)), ("2024", "St Kilda", stats(9, 6, 2))], 2024)
+
+    assert merge_statistics_table(old, new) is None
+
+
+def test_misaligned_rows_fall_back_to_replacing_the_section():
+    old = article([("2023", "Geelong", stats(12, 20, 15)[:-1])], 2023)
+    new = statistics([("2023", "Geelong", stats(12, 21, 15))], 2023)
+
+    assert merge_statistics_table(old, new) is None
+    updated, changes = merge_statistics_section(old, new)
+    assert changes is None
+    assert season_values(updated)[("2023", "Geelong")] == [str(value) for value in stats(12, 21, 15)]
+    assert updated.startswith(ARTICLE_HEAD) and "==References==" in updated
+
+
+def test_unchanged_statistics_give_an_empty_change_set():
+    old = article([("2023", "Geelong", stats(12, 20, 15))], 2023, access_date="1 January 2024")
+    new = statistics([("2023", "Geelong", stats(12, 20, 15))], 2023, access_date="17 October 2026")
+
+    assert merge_statistics_table(old, new) == (old, [])
+    assert merge_statistics_section(old, new) == (old, [])
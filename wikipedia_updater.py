@@ -1,23 +1,65 @@
-from pywikibot import config
-import pywikibot
+# pywikibot is imported where it is used: importing it reads its user config
+# and sets up an HTTP session, which dry runs and replay never need
 from dotenv import load_dotenv
 import os
 import json
 from datetime import datetime
-import pandas as pd
 import logging
 import re
+import threading
+import time
+from rate_limiter import WIKI_EDIT_LIMITER
+from metrics import METRICS
+from cpu_pool import run_cpu
+from wikitable import extract_cell_formatting, apply_cell_formatting, merge_statistics_table, same_statistics
+
+# Seconds the shared edit limiter pauses after maxlag / ratelimited responses
+MAXLAG_PAUSE = 60
+RATELIMITED_PAUSE = 120
+
+# Seconds a login is trusted before the next run re-checks it with one userinfo request
+LOGIN_CHECK_INTERVAL = 15 * 60
+
+# Bump whenever generate_wiki_markup or the formatting merge changes its output,
+# so players skipped on an unchanged stats fingerprint get re-rendered.
+WIKI_MARKUP_VERSION = 3
+
+# Fixed parts of the Statistics table shared by every rendered player
+SEASON_STAT_KEYS = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T"]
+AVERAGE_STAT_KEYS = ["G", "B", "K", "H", "D", "M", "T"]
+CAREER_STAT_KEYS = ["Games", "G", "B", "K", "H", "D", "M", "T"]
+STATS_TABLE_START = "{{AFL player statistics legend|p=y}}\n{{AFL player statistics start with votes}}\n"
+CAREER_ROW_START = "|-\n! colspan=3| Career\n"
+STATS_TABLE_END = "|}\n\n"
+
+def merge_statistics_section(old_wikitext, new_stats_markup):
+    """
+    Returns (updated_wikitext, changes). When the article already has a
+    Statistics table, new values are merged into it cell by cell and changes
+    lists the CellChanges (empty: nothing to edit). Otherwise the section is
+    inserted or replaced wholesale and changes is None, unless the result
+    only differs in access-date, whitespace or attribute order, which also
+    gives an empty change set.
+    """
+    merged = merge_statistics_table(old_wikitext, new_stats_markup)
+    if merged is not None:
+        return merged
+    updated_wikitext = replace_statistics_section_in_wikitext(old_wikitext, new_stats_markup)
+    if same_statistics(old_wikitext, updated_wikitext):
+        return old_wikitext, []
+    return updated_wikitext, None
 
 def update_or_insert_statistics_section_in_wikitext(old_wikitext, new_stats_markup):
+    return merge_statistics_section(old_wikitext, new_stats_markup)[0]
+
+def replace_statistics_section_in_wikitext(old_wikitext, new_stats_markup):
     pattern = re.compile(r'(==Statistics==.*?)(?=^==|\n''' + re.escape("'''Notes'''") + r'|\Z)', 
                          re.DOTALL | re.MULTILINE)
     
-    # Extract special formatting from old content
-    special_formatting = extract_special_formatting(old_wikitext)
-    
-    # Apply special formatting to new content
-    if special_formatting:
-        new_stats_markup = apply_special_formatting(new_stats_markup, special_formatting)
+    # Carry cell formatting (leaders, premiership seasons, notes) over to the new values
+    cell_formatting = extract_cell_formatting(old_wikitext)
+    if cell_formatting:
+        new_stats_markup = apply_cell_formatting(new_stats_markup, cell_formatting)
     
     if pattern.search(old_wikitext):
         updated_wikitext = pattern.sub(new_stats_markup, old_wikitext)
@@ -55,199 +97,6 @@ def update_or_insert_statistics_section_in_wikitext(old_wikitext, new_stats_mark
             updated_wikitext = old_wikitext.strip() + "\n" + new_stats_markup
     return updated_wikitext
 
-def extract_special_formatting(wikitext):
-    """
-    Extract special formatting from the existing wikitext:
-    - Bold text for leading players (bgcolor=CAE1FF with '''value''')
-    - Special year formatting (bgcolor=F0E68C)
-    - Notes ({{efn|...}})
-    """
-    special_formatting = {
-        'leading_stats': {},  # Format: {season: {stat_key: value}}
-        'special_years': {},  # Format: {season: formatting}
-        'notes': {}           # Format: {season: note_text}
-    }
-    
-    # Extract leading stats (bold text with bgcolor)
-    leading_pattern = leading_pattern = re.compile(r'\|\s*bgcolor=CAE1FF\s*\|\s*\'\'\'([^<]*?)\'\'\'(?:<sup>†</sup>)?')
-    leading_matches = leading_pattern.finditer(wikitext)
-    
-    # Find season context for each match
-    season_pattern = re.compile(r'\|\s*\[\[(\d{4})[^\]]*\]\]')
-    special_year_pattern = re.compile(r'\|\s*bgcolor=F0E68C\s*\|\s*\'\'\'(?:\[\[(\d{4})[^\]]*\]\])\'\'\'(?:<sup>#</sup>)?')
-    notes_pattern = re.compile(r'\[\[(\d{4})[^\]]*\]\]({{efn\|[^}]*}})')
-    
-    # Process the wikitext line by line to associate seasons with stats
-    lines = wikitext.split('\n')
-    current_season = None
-    
-    for i, line in enumerate(lines):
-        # Check for regular season
-        season_match = season_pattern.search(line)
-        if season_match:
-            current_season = season_match.group(1)
-            
-            # Check for notes in this season
-            notes_match = notes_pattern.search(line)
-            if notes_match:
-                note_text = notes_match.group(2)
-                special_formatting['notes'][current_season] = note_text
-            elif '{{efn|' in line:
-                note_start = line.find('{{efn|')
-                note_end = line.find('}}', note_start)
-                if note_end > note_start:
-                    note_text = line[note_start:note_end+2]
-                    special_formatting['notes'][current_season] = note_text
-        
-        # Check for special year formatting
-        special_year_match = special_year_pattern.search(line)
-        if special_year_match:
-            current_season = special_year_match.group(1)
-            # Store the entire line including the team info
-            special_formatting['special_years'][current_season] = line.strip()
-            # If there's a note in the next line, associate it with this season
-            if i + 1 < len(lines) and '{{efn|' in lines[i + 1]:
-                note_start = lines[i + 1].find('{{efn|')
-                note_end = lines[i + 1].find('}}', note_start)
-                if note_end > note_start:
-                    note_text = lines[i + 1][note_start:note_end+2]
-                    special_formatting['notes'][current_season] = note_text
-        
-        # If we have a current season, check for leading stats
-        if current_season and 'bgcolor=CAE1FF' in line:
-            # Initialize dict for this season if not exists
-            if current_season not in special_formatting['leading_stats']:
-                special_formatting['leading_stats'][current_season] = {}
-                
-            # Extract the stat value and position
-            leading_match = leading_pattern.search(line)
-            if leading_match:
-                # Determine which stat this is based on position in the line
-                # This is approximate and may need refinement
-                stat_value = leading_match.group(1).strip()
-                
-                # Count the number of "||" before this match to determine the stat type
-                line_before_match = line[:leading_match.start()]
-                separator_count = line_before_match.count('||')
-                
-                # Map separator count to stat key (approximate mapping)
-                stat_keys = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T", "G_avg", "B_avg", "K_avg", "H_avg", "D_avg", "M_avg", "T_avg", "Votes"]
-                if separator_count < len(stat_keys):
-                    stat_key = stat_keys[separator_count]
-                    special_formatting['leading_stats'][current_season][stat_key] = stat_value
-    
-    return special_formatting
-
-def apply_special_formatting(new_markup, special_formatting):
-    """
-    Apply the extracted special formatting to the new markup
-    """
-    lines = new_markup.split('\n')
-    updated_lines = []
-    current_season = None
-    skip_next_line = False
-    
-    for i, line in enumerate(lines):
-        if skip_next_line:
-            skip_next_line = False
-            continue
-            
-        # Check if this line contains a season
-        season_match = re.search(r'\|\s*\[\[(\d{4})[^\]]*\]\]', line)
-        
-        if season_match:
-            current_season = season_match.group(1)
-            
-            # Apply special year formatting if exists
-            if current_season in special_formatting['special_years']:
-                # Get the original line's statistics
-                stats_parts = line.split('||')
-                if len(stats_parts) > 1:
-                    # Extract the special formatting but keep our season and stats
-                    special_year_line = special_formatting['special_years'][current_season]
-                    season_end_idx = special_year_line.find(']]') + 2
-                    
-                    # Add closing ''' and <sup>#</sup> if they exist in special formatting
-                    season_part = special_year_line[:season_end_idx]
-                    if "'''" in special_year_line and not season_part.endswith("'''"):
-                        season_part += "'''"
-                    if "<sup>#</sup>" in special_year_line:
-                        season_part += "<sup>#</sup>"
-                    
-                    # Combine special formatting for season with existing stats
-                    line = season_part + ' ||' + '||'.join(stats_parts[1:])
-                
-                # Skip the next line (team info) as it's included in the special formatting
-                if i + 1 < len(lines) and "{{AFL Col}}" in lines[i + 1]:
-                    skip_next_line = True
-            
-            # Apply notes if exists
-            if current_season in special_formatting['notes']:
-                note_text = special_formatting['notes'][current_season]
-                # Insert the note after the season
-                season_end = line.find(']]')
-                if season_end > 0:
-                    line = line[:season_end+2] + note_text + line[season_end+2:]
-        
-        # If we have a current season with leading stats, apply them
-        if current_season and current_season in special_formatting['leading_stats']:
-            leading_stats = special_formatting['leading_stats'][current_season]
-            
-            # For each stat in leading_stats, check if it's in this line
-            for stat_key, stat_value in leading_stats.items():
-                # Different handling for regular stats vs averages
-                if '_avg' in stat_key:
-                    base_key = stat_key.split('_')[0]
-                    # Find the average value in the line (after the regular stat)
-                    avg_pattern = re.compile(r'\|\|\s*(\d+\.\d+)\s*(?=\|\|)')
-                    matches = list(avg_pattern.finditer(line))
-                    
-                    # Map stat keys to positions in the averages section
-                    avg_keys = ["G", "B", "K", "H", "D", "M", "T"]
-                    if base_key in avg_keys:
-                        idx = avg_keys.index(base_key)
-                        if idx < len(matches):
-                            # Replace with formatted version
-                            match = matches[idx]
-                            line = line[:match.start()] + '|| bgcolor=CAE1FF | ' + f"'''{stat_value}'''<sup>†</sup>" + line[match.end():]
-                else:
-                    # Regular stats
-                    stat_keys = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T"]
-                    if stat_key in stat_keys:
-                        idx = stat_keys.index(stat_key)
-                        
-                        # Find the stat value in the line
-                        if idx == 0:
-                            # First stat has different format
-                            stat_pattern = re.compile(r'\|\s*(\d+)\s*(?=\|\|)')
-                        else:
-                            # Other stats
-                            stat_pattern = re.compile(r'\|\|\s*(\d+)\s*(?=\|\|)')
-                        
-                        matches = list(stat_pattern.finditer(line))
-                        if idx < len(matches):
-                            # Replace with formatted version
-                            match = matches[idx]
-                            line = line[:match.start()] + ('| ' if idx == 0 else '|| ') + 'bgcolor=CAE1FF | ' + f"'''{stat_value}'''<sup>†</sup>" + line[match.end():]
-                    elif stat_key == "Votes":
-                        # Votes are at the end of the line
-                        votes_pattern = re.compile(r'\|\|\s*(\d+)\s*$')
-                        match = votes_pattern.search(line)
-                        if match:
-                            line = line[:match.start()] + '|| bgcolor=CAE1FF | ' + f"'''{stat_value}'''<sup>†</sup>"
-        
-        # Special handling for career row
-        if "class=sortbottom" in line:
-            # Keep the next line (career header) as is
-            updated_lines.append(line)
-            if i + 1 < len(lines):
-                updated_lines.append(lines[i + 1])
-                skip_next_line = True
-        else:
-            updated_lines.append(line)
-    
-    return '\n'.join(updated_lines)
-
 def generate_wiki_markup(data, player_name, player_url, end_round=None, end_year=None):
     try:
         stats_df = data["stats_df"]
@@ -257,69 +106,42 @@ def generate_wiki_markup(data, player_name, player_url, end_round=None, end_year
         last_entry = stats_df[-1]
         if end_year is None:
             end_year = last_entry["Season"]
-        if end_round is None:
-            end_round = last_entry["Games"]
 
-        header = (
+        # First averages row per season, the one a linear scan would find
+        averages_by_season = {}
+        for average in averages_df:
+            averages_by_season.setdefault(average["Season"], average)
+
+        parts = [
             "==Statistics==\n"
             f"''Updated to the end of the {end_year} season''."
-            f"<ref>{{{{cite web|url={player_url}|title={player_name}|publisher=AFL Tables|access-date={datetime.now().strftime('%d %B %Y')}}}}}</ref>\n\n"
-            "{{AFL player statistics legend|p=y}}\n"
-            "{{AFL player statistics start with votes}}\n"
-        )
-
-        body = header
-        stats_keys = ["No.", "Games", "G", "B", "K", "H", "D", "M", "T"]
-        avg_keys   = ["G", "B", "K", "H", "D", "M", "T"]
-
-        for i, stat in enumerate(stats_df):
+            f"<ref>{{{{cite web|url={player_url}|title={player_name}|publisher=AFL Tables|access-date={datetime.now().strftime('%d %B %Y')}}}}}</ref>\n\n",
+            STATS_TABLE_START,
+        ]
+        for stat in stats_df:
             season = stat["Season"]
-            avg = next((a for a in averages_df if a["Season"] == season), {})
-            
-            body += "|-\n"  # Always start with |-
-            
-            season_link = f"[[{season} AFL season|{season}]]"
-            body += f"| {season_link}"  # No scope="row" or style attributes
-            
-            team = stat.get("Team", "")
-            body += f" || {team}"  # Use || instead of | for team
-            
-            for j, key in enumerate(stats_keys):
-                value = stat.get(key, "")
-                body += f" || {value}"  # Use || for all stats
-            
-            for key in avg_keys:
-                value = avg.get(key, "")
-                body += f" || {value}"
-            
-            votes = votes_dict.get(season, 0)
-            body += f" || {votes}\n"
-        
+            avg = averages_by_season.get(season, {})
+            cells = [f"[[{season} AFL season|{season}]]", str(stat.get("Team", ""))]
+            cells.extend(str(stat.get(key, "")) for key in SEASON_STAT_KEYS)
+            cells.extend(str(avg.get(key, "")) for key in AVERAGE_STAT_KEYS)
+            cells.append(str(votes_dict.get(season, 0)))
+            parts.append("|-\n| " + " || ".join(cells) + "\n")
+
         career_stats = data["total_career_df"][0]
-        career_avgs  = data["total_career_df"][1]
-        career_votes = votes_dict.get("Total Votes", 0)
-        
-        body += "|-\n"
-        body += "! colspan=3| Career\n"
-        
-        career_stats_order = ["Games", "G", "B", "K", "H", "D", "M", "T"]
-        for key in career_stats_order:
-            value = career_stats.get(key, "")
-            body += f"! {value}\n"
-        
-        for key in avg_keys:
-            value = career_avgs.get(key, "")
-            body += f"! {value}\n"
-        
-        body += f"! {career_votes}\n"
-        body += "|}\n\n"
-        
-        return body
+        career_avgs = data["total_career_df"][1]
+        parts.append(CAREER_ROW_START)
+        parts.extend(f"! {career_stats.get(key, '')}\n" for key in CAREER_STAT_KEYS)
+        parts.extend(f"! {career_avgs.get(key, '')}\n" for key in AVERAGE_STAT_KEYS)
+        parts.append(f"! {votes_dict.get('Total Votes', 0)}\n")
+        parts.append(STATS_TABLE_END)
+        return "".join(parts)
     except Exception as e:
         logging.error(f"Error generating wiki markup: {str(e)}")
         return None
 
 def process_player_stats(stats_df, averages_df):
+    import pandas as pd
+    
     try:
         stats_df_copy = stats_df.copy()
         main_df = stats_df_copy.iloc[:-2].copy()
@@ -348,76 +170,328 @@ def process_player_stats(stats_df, averages_df):
         logging.error(f"Error processing player stats: {str(e)}")
         return None, None, None, None
 
-def initialize_apis():
+class WikiSession:
+    """
+    The Wikipedia site shared by every run in this process. The first login
+    loads the cookie jar pywikibot keeps in its base directory
+    (pywikibot-<user>.lwp) and only sends the password when those cookies no
+    longer work. Later runs reuse the logged-in site, and after
+    LOGIN_CHECK_INTERVAL the next run re-checks the session with a single
+    userinfo request, logging in again only if it has expired. The jar is
+    saved after every check so cookies the wiki refreshed outlive the process.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.site = None
+        self.checked_at = None
+
+    def _get_site(self):
+        if self.site is None:
+            import pywikibot
+            from pywikibot import config
+            load_dotenv()
+            config.usernames['wikipedia']['en'] = os.getenv("username_afll")
+            # Edits are paced by the shared WIKI_EDIT_LIMITER instead of a per-thread sleep
+            config.put_throttle = 0
+            self.site = pywikibot.Site('en', 'wikipedia')
+        return self.site
+
+    def get_site(self, login=True):
+        with self.lock:
+            site = self._get_site()
+            if not login:
+                return site
+            if (self.checked_at is not None and time.monotonic() - self.checked_at < LOGIN_CHECK_INTERVAL
+                    and site.logged_in()):
+                return site
+            from pywikibot.comms import http
+            with METRICS.timer("login"):
+                # Forget the cached userinfo so login() asks the wiki whether the session is still valid
+                del site.userinfo
+                site.login()
+            if not site.logged_in():
+                raise RuntimeError(f"Could not log in to {site} as {site.username()}")
+            self.checked_at = time.monotonic()
+            if http.cookie_jar.filename:
+                http.cookie_jar.save(ignore_discard=True)
+            return site
+
+WIKI_SESSION = WikiSession()
+
+def initialize_apis(login=True):
+    """Wikipedia site for the run; login=False gives an anonymous, read-only site (dry runs)."""
     try:
-        load_dotenv()
-        config.usernames['wikipedia']['en'] = os.getenv("username_afll")
-        site = pywikibot.Site('en', 'wikipedia')
-        site.login()
-        return site
+        return WIKI_SESSION.get_site(login=login)
     except Exception as e:
         logging.error(f"Error initializing APIs: {str(e)}")
         return None
     
+# Title variants tried for each player, in order of preference
+NAME_VARIANT_FORMATS = ["{}", "{} (footballer)", "{} (Australian footballer)"]
+
+# advanced_search criteria a page must meet to be treated as the player's article
+PLAYER_PAGE_CRITERIA = {
+    "must_words": ["afl"],
+    "one_of": ["footballer", "football", "afl"]
+}
+
 def fetch_afl_player_page(site, player_name):
     """
     Tries to fetch a Wikipedia page for an AFL player.
     If the page doesn't exist, it appends (footballer) and then (Australian footballer) as fallbacks.
     """
-    name_variants = [player_name, f"{player_name} (footballer)", f"{player_name} (Australian footballer)"]
-
-    criteria = {
-        "must_words": ["afl"],      
-        "one_of": ["footballer", "football", "afl"]            
-    }
+    import pywikibot
+    name_variants = [variant.format(player_name) for variant in NAME_VARIANT_FORMATS]
 
     for name in name_variants:
         page = pywikibot.Page(site, name)
         try:
             current_content = page.text  # Attempt to load page content
-            if advanced_search(current_content, **criteria):
+            if advanced_search(current_content, **PLAYER_PAGE_CRITERIA):
                 logging.info(f"Page '{name}' matches the criteria.")
                 return page  # Return the valid page
             else:
                 logging.warning(f"Page '{name}' does not match the criteria.")
-        except pywikibot.exceptions.NoPage:
+        except pywikibot.exceptions.NoPageError:
             logging.info(f"Page '{name}' does not exist, trying next variant.")
     
     logging.warning("No valid page found for the player.")
     return None  # No valid page found
 
+def resolve_player_pages(site, player_names, batch_size=50, title_cache=None):
+    """
+    Batch version of fetch_afl_player_page. Every title variant of every player
+    is loaded through multi-title queries of batch_size titles, redirects are
+    followed with one more batched query, and PLAYER_PAGE_CRITERIA is checked
+    locally. Returns {player_name: page or None}; pages have their text loaded.
+
+    With a title_cache, known titles are loaded directly, players known to have
+    no article cost no request at all, manual overrides are trusted as-is, and
+    every probe result is written back. A cached title that no longer matches
+    is dropped and probed again.
+    """
+    resolved = {}
+    candidates = {}
+    overrides = set()
+    for player_name in player_names:
+        entry = title_cache.lookup(player_name) if title_cache else None
+        if entry is None:
+            candidates[player_name] = [variant.format(player_name) for variant in NAME_VARIANT_FORMATS]
+        elif entry[0] is None:
+            resolved[player_name] = None
+        else:
+            candidates[player_name] = [entry[0]]
+            if entry[1] == "override":
+                overrides.add(player_name)
+
+    resolved.update(_load_candidate_pages(site, candidates, batch_size, overrides))
+    if title_cache is None:
+        return resolved
+
+    probed = [name for name, titles in candidates.items() if len(titles) > 1]
+    stale = [name for name, titles in candidates.items()
+             if len(titles) == 1 and name not in overrides and resolved[name] is None]
+    if stale:
+        for player_name in stale:
+            title_cache.invalidate(player_name)
+        retry = {name: [variant.format(name) for variant in NAME_VARIANT_FORMATS] for name in stale}
+        resolved.update(_load_candidate_pages(site, retry, batch_size))
+    title_cache.store_many({
+        name: (resolved[name].title() if resolved[name] is not None else None)
+        for name in probed + stale
+    })
+    return resolved
+
+def _load_candidate_pages(site, candidates, batch_size, trusted=()):
+    """{player_name: [title, ...]} -> {player_name: first matching page or None}."""
+    import pywikibot
+    pages_by_player = {
+        player_name: [pywikibot.Page(site, title) for title in titles]
+        for player_name, titles in candidates.items()
+    }
+    all_pages = [page for pages in pages_by_player.values() for page in pages]
+    list(site.preloadpages(all_pages, groupsize=batch_size))
 
-def update_wikipedia_page(player_name, json_data, site, dob):
+    redirect_targets = {}
+    for page in all_pages:
+        if page.exists() and page.isRedirectPage():
+            match = site.redirect_regex.match(page.text)
+            if match:
+                redirect_targets[page.title()] = pywikibot.Page(site, match.group(1))
+    if redirect_targets:
+        list(site.preloadpages(list(redirect_targets.values()), groupsize=batch_size))
+
+    resolved = {}
+    for player_name, pages in pages_by_player.items():
+        resolved[player_name] = None
+        for page in pages:
+            page = redirect_targets.get(page.title(), page)
+            if not page.exists() or page.isRedirectPage():
+                continue
+            if player_name in trusted or advanced_search(page.text, **PLAYER_PAGE_CRITERIA):
+                logging.info(f"Page '{page.title()}' matches the criteria.")
+                resolved[player_name] = page
+                break
+        if resolved[player_name] is None:
+            logging.warning(f"No valid page found for {player_name}.")
+    return resolved
+
+class PagePreloader:
+    """
+    Hands preloaded pages to update_wikipedia_page. When a player is asked for,
+    it is resolved together with the next unresolved players in run order,
+    so one resolve_player_pages call covers players_per_batch players
+    (three title variants each, 50 titles per API query).
+
+    The lock only guards the bookkeeping; batches are resolved outside it, so
+    expect() from the scrape threads never waits on a wiki request. A player
+    whose page is already being resolved in another worker's batch waits for
+    that batch instead of starting a new one.
+    """
+
+    def __init__(self, site, player_names=(), players_per_batch=16, title_cache=None):
+        self.site = site
+        self.title_cache = title_cache
+        self.players_per_batch = players_per_batch
+        self.order = []
+        self.position = {}
+        self.pages = {}
+        self.done = set()
+        self.discarded = set()
+        self.resolving = {}
+        self.lock = threading.Lock()
+        self.expect(player_names)
+
+    def expect(self, player_names):
+        with self.lock:
+            for player_name in player_names:
+                if player_name not in self.position:
+                    self.position[player_name] = len(self.order)
+                    self.order.append(player_name)
+
+    def discard(self, player_name):
+        """Player no longer needs a page (skipped or finished)."""
+        with self.lock:
+            self.done.add(player_name)
+            self.discarded.add(player_name)
+            self.pages.pop(player_name, None)
+
+    def get(self, player_name):
+        while True:
+            with self.lock:
+                self.done.add(player_name)
+                if player_name in self.pages:
+                    return self.pages.pop(player_name)
+                in_flight = self.resolving.get(player_name)
+                if in_flight is None:
+                    batch = [player_name]
+                    start = self.position.get(player_name, len(self.order)) + 1
+                    for upcoming in self.order[start:]:
+                        if len(batch) >= self.players_per_batch:
+                            break
+                        if upcoming not in self.done and upcoming not in self.pages and upcoming not in self.resolving:
+                            batch.append(upcoming)
+                    finished = threading.Event()
+                    for name in batch:
+                        self.resolving[name] = finished
+                    break
+            in_flight.wait()
+
+        resolved = None
+        try:
+            resolved = resolve_player_pages(self.site, batch, title_cache=self.title_cache)
+        except Exception as e:
+            logging.error(f"Batch title resolution failed, falling back to single lookup: {str(e)}")
+        finally:
+            with self.lock:
+                for name in batch:
+                    self.resolving.pop(name, None)
+                if resolved is not None:
+                    page = resolved.pop(player_name)
+                    self.pages.update((name, other) for name, other in resolved.items() if name not in self.discarded)
+            finished.set()
+        if resolved is None:
+            return fetch_afl_player_page(self.site, player_name)
+        return page
+
+def render_statistics_update(json_data, player_name, player_url, current_content):
+    """
+    CPU-bound part of update_wikipedia_page, run in a CpuPool worker when one
+    is given: (updated_content, changes) as from merge_statistics_section, or
+    None if the table could not be rendered.
+    """
+    stats_text = generate_wiki_markup(json_data, player_name, player_url)
+    if stats_text is None:
+        return None
+    return merge_statistics_section(current_content, stats_text)
+
+def update_wikipedia_page(player_name, json_data, site, dob, preloader=None, edit_limiter=WIKI_EDIT_LIMITER,
+                          cpu_pool=None, archive=None):
+    """
+    Merges the rendered Statistics table into the player's page and saves it.
+    Returns True once the page is up to date, None if the player has no
+    article and False on failure. preloader supplies the page (a DryRun
+    writes files instead of editing); edit_limiter=None skips edit pacing;
+    cpu_pool moves rendering and the merge to a worker process; archive keeps
+    the wikitext as it was before the edit.
+    """
     try:
         logging.info(f"Updating Wikipedia page for {player_name} {dob}")
-        page = fetch_afl_player_page(site,player_name)
+        with METRICS.timer("title_lookup"):
+            if preloader is not None:
+                page = preloader.get(player_name)
+            else:
+                page = fetch_afl_player_page(site, player_name)
         if page is None:
             logging.warning(f"No valid page found for {player_name}")
-            return False
+            return None
         
-        current_content = page.text
+        with METRICS.timer("page_load"):
+            current_content = page.text
+        # str(site): the same text the cite url got before, without sending the site to a worker
+        player_url = str(site)
+        if archive is not None:
+            archive.put("wikitext", player_name, current_content, title=page.title(), source=player_url)
         
-        stats_text = generate_wiki_markup(json_data, player_name, site)
-        if stats_text is None:
+        with METRICS.timer("render_merge"):
+            rendered = run_cpu(cpu_pool, render_statistics_update, json_data, player_name, player_url, current_content)
+        if rendered is None:
             return False
-            
-        updated_content = update_or_insert_statistics_section_in_wikitext(current_content, stats_text)
-        # with open("output.txt", "w", encoding="utf-8") as file:
-        #     file.write(updated_content)
-        # print("File saved successfully!")
-        # input("Press Enter to continue...")
+        updated_content, changes = rendered
+        if changes:
+            seasons = sorted({str(change.season) for change in changes})
+            logging.info(f"{len(changes)} statistics cells changed for {player_name} ({', '.join(seasons)})")
         # Check if content has actually changed before updating
-        if updated_content == current_content:
+        if changes == [] or updated_content == current_content:
             print(f"No changes detected for {player_name}'s page - skipping update")
             logging.info(f"No changes detected for {player_name}'s page - skipping update")
+            METRICS.count("unchanged")
             return True
             
+        import pywikibot
         # Add timeout to save operation
         try:
+            if edit_limiter is not None:
+                with METRICS.timer("edit_throttle"):
+                    edit_limiter.acquire()
             page.text = updated_content
-            page.save(summary='Updated player statistics')
+            with METRICS.timer("save"):
+                page.save(summary='Updated player statistics')
             logging.info(f"Successfully updated page for {player_name}")
+            METRICS.count("edited")
             return True
+        except pywikibot.exceptions.MaxlagTimeoutError:
+            WIKI_EDIT_LIMITER.pause(MAXLAG_PAUSE, "(replication lag)")
+            logging.error(f"Server lag too high while saving page for {player_name}")
+            return False
+        except pywikibot.exceptions.APIError as e:
+            if e.code == "maxlag":
+                WIKI_EDIT_LIMITER.pause(float(e.other.get("lag", MAXLAG_PAUSE)), "(maxlag)")
+            elif e.code == "ratelimited":
+                WIKI_EDIT_LIMITER.pause(RATELIMITED_PAUSE, "(ratelimited)")
+            logging.error(f"API error while saving page for {player_name}: {e.code}")
+            return False
         except pywikibot.exceptions.TimeoutError:
             logging.error(f"Timeout while saving page for {player_name}")
             return False
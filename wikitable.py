@@ -0,0 +1,569 @@
+import re
+from collections import namedtuple
+
+# Column order of a row produced by generate_wiki_markup
+STATS_COLUMNS = (
+    "Season", "Team", "No.", "Games", "G", "B", "K", "H", "D", "M", "T",
+    "G_avg", "B_avg", "K_avg", "H_avg", "D_avg", "M_avg", "T_avg", "Votes"
+)
+SEASON_COLUMN = 0
+TEAM_COLUMN = 1
+# Cells after the "Career" label in the totals row
+CAREER_COLUMNS = STATS_COLUMNS[3:]
+
+# One cell whose value differs between the article and AFL Tables. old is None
+# for cells of a season row the article did not have yet.
+CellChange = namedtuple("CellChange", ["season", "occurrence", "column", "old", "new"])
+
+# One scanner for the cell separators of a table line. Link and template
+# brackets are tokens too so separators nested in them can be skipped.
+CELL_TOKEN_RE = re.compile(r"\[\[|\]\]|\{\{|\}\}|\|\||!!")
+BRACKETED_SEPARATOR_RE = re.compile(r"\[\[[^\]]*\|\||\{\{[^}]*\|\|")
+# A whole cell: optional attributes before a bare |, then the value with
+# whatever formatting surrounds it. Attributes can't contain [ or { so pipes
+# inside links and templates are never mistaken for the attribute separator.
+_CELL_PATTERN = (
+    r"(?P<lead>\s*)(?:(?P<attrs>[^|\[{]*?)\s*\|(?!\|)\s*)?"
+    r"(?P<prefix>.*?)(?P<value>%s)(?P<suffix>.*?)(?P<trail>\s*)"
+)
+SEASON_VALUE = r"\[\[\d{4}[^\]]*\]\]"
+STAT_VALUE = r"-?\d+(?:\.\d+)?"
+SEASON_CELL_RE = re.compile(_CELL_PATTERN % SEASON_VALUE, re.DOTALL)
+STAT_CELL_RE = re.compile(_CELL_PATTERN % STAT_VALUE, re.DOTALL)
+# Cells with nothing around the value, as generate_wiki_markup writes them
+SEASON_VALUE_RE = re.compile(SEASON_VALUE)
+STAT_VALUE_RE = re.compile(STAT_VALUE)
+# |- and |} lines end a row; a season row starts with a [[YYYY ...]] link in its first cell
+ROW_DELIMITER_RE = re.compile(r"\n[ \t]*\|[-}][^\n]*")
+ROW_SEASON_RE = re.compile(r"\s*[|!](?:(?!\|\||!!)[^\n])*?\[\[(\d{4})")
+CAREER_ROW_RE = re.compile(r"\s*[|!](?:(?!\|\||!!)[^\n])*?Career", re.IGNORECASE)
+# Parts of the section heading refreshed when the table changes
+UPDATED_SEASON_RE = re.compile(r"(Updated to the end of the )(\d{4})( season)")
+ACCESS_DATE_RE = re.compile(r"(access-date\s*=\s*)([^|}]*)")
+STATISTICS_HEADING_RE = re.compile(r"==[ \t]*Statistics[ \t]*==")
+# Display text of a [[target|text]] or [[text]] link, for comparing club names
+LINK_TEXT_RE = re.compile(r"\[\[(?:[^|\]]*\|)?([^\]]*)\]\]")
+# Volatile or layout-only parts ignored when deciding whether an edit changes anything
+WHITESPACE_RE = re.compile(r"\s+")
+CELL_ATTRS_RE = re.compile(r"([^|\[{]*=[^|\[{]*?)\|(?!\|)(.*)", re.DOTALL)
+ATTRIBUTE_RE = re.compile(r"""([\w-]+)\s*=\s*("[^"]*"|'[^']*'|[^\s"']+)""")
+# Formatting worth carrying over: highlighted cells, bold, <sup> markers, notes
+HIGHLIGHT_ATTR_RE = re.compile(r"bgcolor|background", re.IGNORECASE)
+DECORATION_RE = re.compile(r"'''|<sup|\{\{efn", re.IGNORECASE)
+
+
+def _is_simple_row(line):
+    if "!!" in line:
+        return False
+    return ("[[" not in line and "{{" not in line) or not BRACKETED_SEPARATOR_RE.search(line)
+
+
+def _may_be_formatted(text):
+    # Substring checks are far cheaper than a case-insensitive regex, and every
+    # attribute, bold, <sup> or {{efn}} needs one of these characters
+    return "'" in text or "=" in text or "<" in text or "{" in text
+
+
+def split_cells(line):
+    """
+    Splits one table line (without its leading | or !) into raw cell strings.
+    || and !! separate cells except inside [[...]] or {{...}}; rows without
+    such nesting are split by str.split, anything else by one token scan.
+    """
+    if _is_simple_row(line):
+        return line.split("||")
+    return tokenize_cells(line)[0]
+
+
+def tokenize_cells(line):
+    """split_cells plus the separator (|| or !!) in front of every cell after the first."""
+    if _is_simple_row(line):
+        pieces = line.split("||")
+        return pieces, ["||"] * (len(pieces) - 1)
+    pieces = []
+    separators = []
+    depth = 0
+    start = 0
+    for match in CELL_TOKEN_RE.finditer(line):
+        token = match.group()
+        if token == "[[" or token == "{{":
+            depth += 1
+        elif token == "]]" or token == "}}":
+            depth = max(0, depth - 1)
+        elif not depth:
+            pieces.append(line[start:match.start()])
+            separators.append(token)
+            start = match.end()
+    pieces.append(line[start:])
+    return pieces, separators
+
+
+def iter_season_rows(text):
+    """
+    Yields (start, end, season, occurrence) spans of the season rows in table
+    text. Rows are found by their |- delimiters with one regex pass, so a row
+    costs a single iteration however many lines or cells it has; occurrence
+    numbers repeated seasons (a player on two clubs in one year).
+    """
+    seen = {}
+    start = 0
+    delimiters = [match.span() for match in ROW_DELIMITER_RE.finditer(text)]
+    delimiters.append((len(text), len(text)))
+    for end, next_start in delimiters:
+        match = ROW_SEASON_RE.match(text, start, end)
+        if match:
+            season = match.group(1)
+            seen[season] = seen.get(season, -1) + 1
+            yield start, end, season, seen[season]
+        start = next_start
+
+
+def iter_row_cells(lines):
+    """Yields (line_index, column_offset, pieces) for the cell lines of one row."""
+    column = 0
+    for index, line in enumerate(lines):
+        stripped = line.lstrip()
+        if stripped[:1] not in ("|", "!") or stripped[:2] == "|+":
+            continue
+        pieces = split_cells(stripped[1:])
+        yield index, column, pieces
+        column += len(pieces)
+
+
+def statistics_table(wikitext):
+    """Text of the table under ==Statistics== (the whole text if there is no such section)."""
+    heading = STATISTICS_HEADING_RE.search(wikitext)
+    if not heading:
+        return wikitext
+    end = wikitext.find("\n|}", heading.end())
+    return wikitext[heading.end():end if end != -1 else len(wikitext)]
+
+
+def _match_cell(column, piece):
+    pattern = SEASON_CELL_RE if column == SEASON_COLUMN else STAT_CELL_RE
+    return pattern.fullmatch(piece)
+
+
+def _split_cell(column, piece):
+    """
+    (lead, before, value, after, trail) of a cell, or None if it has no value
+    for column. before/after hold attributes and formatting; a bare value
+    skips the full cell pattern.
+    """
+    value = piece.strip()
+    if column == SEASON_COLUMN:
+        bare = SEASON_VALUE_RE.fullmatch(value)
+    else:
+        bare = value.isdecimal() or STAT_VALUE_RE.fullmatch(value)
+    if bare:
+        lead = len(piece) - len(piece.lstrip())
+        return piece[:lead], "", value, "", piece[lead + len(value):]
+    match = _match_cell(column, piece)
+    if match is None:
+        return None
+    lead, trail = match.group("lead", "trail")
+    before = piece[len(lead):match.start("value")]
+    after = piece[match.end("value"):len(piece) - len(trail)]
+    return lead, before, match.group("value"), after, trail
+
+
+def extract_cell_formatting(wikitext):
+    """
+    Reads the existing Statistics table once and returns
+    {(season, occurrence, column): (attrs, prefix, suffix)} for every season or
+    stat cell that carries formatting around its value: bgcolor attributes
+    (CAE1FF leaders, F0E68C seasons), bold, <sup> markers and {{efn}} notes.
+    """
+    formatting = {}
+    table = statistics_table(wikitext)
+    for start, end, season, occurrence in iter_season_rows(table):
+        row = table[start:end]
+        if not _may_be_formatted(row):
+            continue
+        for _, offset, pieces in iter_row_cells(row.split("\n")):
+            candidates = [i for i, piece in enumerate(pieces)
+                          if "'" in piece or "=" in piece or "<" in piece or "{" in piece]
+            for position in candidates:
+                column = offset + position
+                if column == TEAM_COLUMN or column >= len(STATS_COLUMNS):
+                    continue
+                match = _match_cell(column, pieces[position])
+                if match is None:
+                    continue
+                attrs, prefix, suffix = match.group("attrs", "prefix", "suffix")
+                attrs = attrs if attrs and HIGHLIGHT_ATTR_RE.search(attrs) else ""
+                if attrs or DECORATION_RE.search(prefix) or DECORATION_RE.search(suffix):
+                    formatting[(season, occurrence, column)] = (attrs, prefix, suffix)
+    return formatting
+
+
+def _format_row(lines, decorations):
+    """Applies [(column, (attrs, prefix, suffix))] to one row's lines in place; True if any cell changed."""
+    changed = False
+    for index, offset, pieces in list(iter_row_cells(lines)):
+        line_changed = False
+        for column, (attrs, prefix, suffix) in decorations:
+            position = column - offset
+            if not 0 <= position < len(pieces):
+                continue
+            parts = _split_cell(column, pieces[position])
+            if parts is None:
+                continue
+            lead, _, value, _, trail = parts
+            content = prefix + value + suffix
+            cell = f"{attrs} | {content}" if attrs else content
+            pieces[position] = lead + cell + trail
+            line_changed = True
+        if line_changed:
+            line = lines[index]
+            stripped = line.lstrip()
+            marker = stripped[0]
+            lines[index] = line[:len(line) - len(stripped)] + marker + (marker * 2).join(pieces)
+            changed = True
+    return changed
+
+
+def apply_cell_formatting(new_markup, formatting):
+    """
+    Re-applies formatting from extract_cell_formatting to freshly generated
+    markup by (season, occurrence, column) lookup, keeping the new values.
+    Only rows that receive formatting are split; the rest of the text is
+    copied through untouched.
+    """
+    if not formatting:
+        return new_markup
+    by_row = {}
+    for (season, occurrence, column), decoration in formatting.items():
+        by_row.setdefault((season, occurrence), []).append((column, decoration))
+    parts = []
+    copied = 0
+    for start, end, season, occurrence in iter_season_rows(new_markup):
+        decorations = by_row.get((season, occurrence))
+        if not decorations:
+            continue
+        lines = new_markup[start:end].split("\n")
+        if _format_row(lines, decorations):
+            parts.append(new_markup[copied:start])
+            parts.append("\n".join(lines))
+            copied = end
+    parts.append(new_markup[copied:])
+    return "".join(parts)
+
+
+class Cell:
+    """
+    One table cell split around its value. before/after hold everything else
+    verbatim (spacing, attributes, bold, <sup>, {{efn}}), so str(cell) is the
+    original text until value is replaced.
+    """
+    __slots__ = ("before", "value", "after")
+
+    def __init__(self, column, piece):
+        parts = _split_cell(column, piece)
+        if parts is not None:
+            lead, before, self.value, after, trail = parts
+            self.before = lead + before
+            self.after = after + trail
+        else:
+            content = piece.strip()
+            self.before = piece[:len(piece) - len(piece.lstrip())]
+            self.value = content
+            self.after = piece[len(self.before) + len(content):]
+
+    def __str__(self):
+        return self.before + self.value + self.after
+
+
+class TableRow:
+    """
+    One |- delimited row. Cells are parsed on first use and the row is only
+    re-serialised once one of them changes; otherwise the original text is
+    written back untouched.
+    """
+
+    def __init__(self, delimiter, body, season=None, occurrence=None, is_career=False):
+        self.delimiter = delimiter
+        self.body = body
+        self.season = season
+        self.occurrence = occurrence
+        self.is_career = is_career
+        self.dirty = False
+        self._lines = None
+
+    def _parse(self):
+        self._lines = []
+        column = 0
+        for line in self.body.split("\n"):
+            stripped = line.lstrip()
+            if stripped[:1] not in ("|", "!") or stripped[:2] == "|+":
+                self._lines.append(line)
+                continue
+            pieces, separators = tokenize_cells(stripped[1:])
+            cells = [Cell(column + i, piece) for i, piece in enumerate(pieces)]
+            self._lines.append((line[:len(line) - len(stripped)] + stripped[0], cells, separators))
+            column += len(cells)
+
+    def cells(self):
+        if self._lines is None:
+            self._parse()
+        return [cell for line in self._lines if not isinstance(line, str) for cell in line[1]]
+
+    def set_value(self, cell, value):
+        cell.value = value
+        self.dirty = True
+
+    def __str__(self):
+        if not self.dirty:
+            return self.delimiter + self.body
+        lines = []
+        for line in self._lines:
+            if isinstance(line, str):
+                lines.append(line)
+                continue
+            marker, cells, separators = line
+            text = str(cells[0])
+            for separator, cell in zip(separators, cells[1:]):
+                text += separator + str(cell)
+            lines.append(marker + text)
+        return self.delimiter + "\n".join(lines)
+
+
+class StatsTable:
+    """
+    Lossless view of a Statistics section: the heading text up to the first
+    row, the |- rows, and everything from the closing |} on. str(table) gives
+    back the exact text it was parsed from until merge() changes a cell.
+    """
+
+    def __init__(self, text):
+        self.rows = []
+        self.tail = ""
+        delimiters = list(ROW_DELIMITER_RE.finditer(text))
+        self.head = text[:delimiters[0].start()] if delimiters else text
+        seen = {}
+        for i, delimiter in enumerate(delimiters):
+            if delimiter.group().lstrip().startswith("|}"):
+                self.tail = text[delimiter.start():]
+                break
+            end = delimiters[i + 1].start() if i + 1 < len(delimiters) else len(text)
+            body = text[delimiter.end():end]
+            season_match = ROW_SEASON_RE.match(body)
+            if season_match:
+                season = season_match.group(1)
+                seen[season] = seen.get(season, -1) + 1
+                self.rows.append(TableRow(delimiter.group(), body, season, seen[season]))
+            else:
+                self.rows.append(TableRow(delimiter.group(), body, is_career=bool(CAREER_ROW_RE.match(body))))
+
+    def season_rows(self):
+        return {(row.season, row.occurrence): row for row in self.rows if row.season is not None}
+
+    def career_row(self):
+        return next((row for row in self.rows if row.is_career), None)
+
+    def pair_season_rows(self, new):
+        """
+        {(season, occurrence) of a row of `new`: the row of this table it
+        updates}; rows left out are seasons the article lacks. A season with
+        rows for several clubs is paired by club name, so clubs listed in
+        another order can't swap statistics. None when a club row of the
+        article and one of `new` are both left unpaired, since either could
+        be the other's.
+        """
+        old_by_season = {}
+        for row in self.rows:
+            if row.season is not None:
+                old_by_season.setdefault(row.season, []).append(row)
+        new_by_season = {}
+        for row in new.rows:
+            if row.season is not None:
+                new_by_season.setdefault(row.season, []).append(row)
+
+        pairs = {}
+        for season, new_rows in new_by_season.items():
+            old_rows = old_by_season.get(season, [])
+            if len(new_rows) == 1 and len(old_rows) <= 1:
+                if old_rows:
+                    pairs[(season, 0)] = old_rows[0]
+                continue
+            old_by_club = {}
+            for row in old_rows:
+                old_by_club.setdefault(_club_name(row), []).append(row)
+            paired = 0
+            for new_row in new_rows:
+                candidates = old_by_club.get(_club_name(new_row))
+                if candidates:
+                    pairs[(season, new_row.occurrence)] = candidates.pop(0)
+                    paired += 1
+            if paired < len(new_rows) and paired < len(old_rows):
+                return None
+        return pairs
+
+    def merge(self, new):
+        """
+        Copies the values of `new` (a StatsTable of freshly generated markup)
+        into this table cell by cell and returns the list of CellChanges.
+        Team names and cells the new table leaves blank are kept as they are;
+        seasons the article lacks are inserted after its last season row.
+        Returns None when the two tables' rows don't line up column for column
+        or a season's club rows can't be paired (see pair_season_rows).
+        """
+        changes = []
+        existing = self.pair_season_rows(new)
+        if existing is None:
+            return None
+        insert_at = max((i + 1 for i, row in enumerate(self.rows) if row.season is not None), default=0)
+        for new_row in new.rows:
+            if new_row.season is not None:
+                row = existing.get((new_row.season, new_row.occurrence))
+                if row is None:
+                    self.rows.insert(insert_at, new_row)
+                    insert_at += 1
+                    changes.extend(
+                        CellChange(new_row.season, new_row.occurrence, STATS_COLUMNS[column], None, cell.value)
+                        for column, cell in enumerate(new_row.cells()[:len(STATS_COLUMNS)])
+                        if column != SEASON_COLUMN
+                    )
+                    continue
+                columns = STATS_COLUMNS
+                old_cells, new_cells = row.cells(), new_row.cells()
+                skip = TEAM_COLUMN + 1
+            elif new_row.is_career:
+                row = self.career_row()
+                if row is None:
+                    return None
+                columns = CAREER_COLUMNS
+                # Drop the "Career" label so both layouts index from the first total
+                old_cells, new_cells = row.cells()[1:], new_row.cells()[1:]
+                skip = 0
+            else:
+                continue
+            if len(old_cells) != len(new_cells) or len(new_cells) > len(columns):
+                return None
+            for column in range(skip, len(new_cells)):
+                old_cell, value = old_cells[column], new_cells[column].value
+                if value and value != old_cell.value:
+                    changes.append(CellChange(
+                        new_row.season or "Career", new_row.occurrence, columns[column],
+                        old_cell.value, value
+                    ))
+                    row.set_value(old_cell, value)
+        if changes:
+            self.refresh_head(new.head)
+        return changes
+
+    def refresh_head(self, new_head):
+        """Moves the "Updated to the end of the YYYY season" year and the ref's access-date to new_head's."""
+        season = UPDATED_SEASON_RE.search(new_head)
+        if season:
+            self.head = UPDATED_SEASON_RE.sub(lambda m: m.group(1) + season.group(2) + m.group(3), self.head, count=1)
+        access_date = ACCESS_DATE_RE.search(new_head)
+        if access_date:
+            self.head = ACCESS_DATE_RE.sub(lambda m: m.group(1) + access_date.group(2), self.head, count=1)
+
+    def __str__(self):
+        return self.head + "".join(str(row) for row in self.rows) + self.tail
+
+
+def _collapse(text):
+    return WHITESPACE_RE.sub(" ", text).strip()
+
+
+def _club_name(row):
+    """The team cell of a season row as plain lowercase text: link text, no attributes or bold."""
+    cells = row.cells()
+    if len(cells) <= TEAM_COLUMN:
+        return ""
+    text = str(cells[TEAM_COLUMN])
+    match = CELL_ATTRS_RE.fullmatch(text)
+    if match:
+        text = match.group(2)
+    return _collapse(LINK_TEXT_RE.sub(r"\1", text).replace("'''", "")).lower()
+
+
+def _normalize_attributes(attrs):
+    pairs = sorted((name.lower(), value.strip("\"'")) for name, value in ATTRIBUTE_RE.findall(attrs))
+    return " ".join(f"{name}={value}" for name, value in pairs)
+
+
+def _normalize_cell(piece):
+    match = CELL_ATTRS_RE.fullmatch(piece)
+    if match:
+        return _normalize_attributes(match.group(1)) + "|" + _collapse(match.group(2))
+    return _collapse(piece)
+
+
+def normalize_statistics_table(text):
+    """
+    Comparison key for Statistics table text: one entry per row holding its
+    delimiter attributes and cell values, with whitespace collapsed, cell
+    attributes sorted and the access-date and "Updated to the end of" season
+    blanked. Splitting a row over several lines or one || line gives the same key.
+    """
+    table = StatsTable(text)
+    head = UPDATED_SEASON_RE.sub(r"\1\3", ACCESS_DATE_RE.sub(r"\1", table.head))
+    key = [_collapse(head)]
+    for row in table.rows:
+        row.cells()
+        cells = []
+        for line in row._lines:
+            if isinstance(line, str):
+                if line.strip():
+                    cells.append(_collapse(line))
+                continue
+            marker, line_cells, _ = line
+            cells.extend(marker.strip() + _normalize_cell(str(cell)) for cell in line_cells)
+        key.append((_normalize_attributes(row.delimiter), tuple(cells)))
+    key.append(_collapse(table.tail))
+    return key
+
+
+def same_statistics(old_wikitext, new_wikitext):
+    """
+    True when new_wikitext differs from old_wikitext only in ways that aren't
+    worth an edit: the ref's access-date, the "Updated to the end of" season,
+    whitespace, or the order of cell attributes in the Statistics table.
+    """
+    if old_wikitext == new_wikitext:
+        return True
+    old_span, new_span = statistics_table_span(old_wikitext), statistics_table_span(new_wikitext)
+    if old_span is None or new_span is None:
+        return False
+    if (_collapse(old_wikitext[:old_span[0]]) != _collapse(new_wikitext[:new_span[0]])
+            or _collapse(old_wikitext[old_span[1]:]) != _collapse(new_wikitext[new_span[1]:])):
+        return False
+    return (normalize_statistics_table(old_wikitext[old_span[0]:old_span[1]])
+            == normalize_statistics_table(new_wikitext[new_span[0]:new_span[1]]))
+
+
+def statistics_table_span(wikitext):
+    """(start, end) of the ==Statistics== heading through the |} that closes its table, or None."""
+    heading = STATISTICS_HEADING_RE.search(wikitext)
+    if not heading:
+        return None
+    end = wikitext.find("\n|}", heading.end())
+    if end == -1:
+        return None
+    return heading.start(), end + len("\n|}")
+
+
+def merge_statistics_table(old_wikitext, new_markup):
+    """
+    Merges freshly generated Statistics markup into the table already in the
+    article. Returns (wikitext, changes): only rows with changed cells are
+    rewritten, the rest of the article is copied through byte for byte, and
+    an empty change set means no edit is needed. Returns None when the article
+    has no Statistics table that lines up with the generated one.
+    """
+    span = statistics_table_span(old_wikitext)
+    if span is None:
+        return None
+    table = StatsTable(old_wikitext[span[0]:span[1]])
+    if not table.season_rows():
+        return None
+    changes = table.merge(StatsTable(new_markup))
+    if changes is None:
+        return None
+    if not changes:
+        return old_wikitext, changes
+    return old_wikitext[:span[0]] + str(table) + old_wikitext[span[1]:], changes
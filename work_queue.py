@@ -0,0 +1,177 @@
+import collections
+import concurrent.futures
+import logging
+import statistics
+import threading
+import time
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit: grows by one per healthy window of items, cut by a quarter on slow or failing ones."""
+
+    def __init__(self, initial, minimum=1, maximum=None, window=20, error_threshold=0.2, latency_factor=1.5):
+        self.minimum = minimum
+        self.maximum = maximum or initial
+        self.limit = max(minimum, min(initial, self.maximum))
+        self.window = window
+        self.error_threshold = error_threshold
+        self.latency_factor = latency_factor
+        self.active = 0
+        self.baseline = None
+        self.samples = []
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+    def release(self, latency=None, ok=True):
+        """Frees a slot; pass the item's latency and outcome to feed the controller."""
+        with self.condition:
+            self.active -= 1
+            if latency is not None:
+                self.samples.append((latency, ok))
+            if len(self.samples) >= self.window:
+                self._adjust()
+            self.condition.notify_all()
+
+    def _adjust(self):
+        median = statistics.median(latency for latency, _ in self.samples)
+        error_rate = sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+        self.samples = []
+
+        if self.baseline is None:
+            self.baseline = median
+        if error_rate > self.error_threshold or median > self.baseline * self.latency_factor:
+            new_limit = max(self.minimum, int(self.limit * 0.75))
+        else:
+            new_limit = min(self.maximum, self.limit + 1)
+            self.baseline = 0.8 * self.baseline + 0.2 * median
+
+        if new_limit != self.limit:
+            logging.info(
+                f"Concurrency {self.limit} -> {new_limit} "
+                f"(median {median:.1f}s, errors {error_rate:.0%})"
+            )
+            self.limit = new_limit
+
+
+class WorkQueue:
+    """
+    Items shared by all workers: one FIFO, or with work_stealing per-worker
+    deques where an idle worker steals from the back of the longest one.
+    """
+
+    def __init__(self, items, worker_count, work_stealing=False):
+        self.lock = threading.Lock()
+        self.work_stealing = work_stealing
+        if work_stealing:
+            self.deques = [collections.deque() for _ in range(worker_count)]
+            for i, item in enumerate(items):
+                self.deques[i % worker_count].append(item)
+        else:
+            self.deques = [collections.deque(items)]
+
+    def get(self, worker_id):
+        """Next item for worker_id, or None once the queue is drained."""
+        with self.lock:
+            if not self.work_stealing:
+                return self.deques[0].popleft() if self.deques[0] else None
+            own = self.deques[worker_id]
+            if own:
+                return own.popleft()
+            victim = max(self.deques, key=len)
+            return victim.pop() if victim else None
+
+    def __len__(self):
+        with self.lock:
+            return sum(len(d) for d in self.deques)
+
+
+class StreamingWorkQueue:
+    """
+    WorkQueue fed from an iterator by a thread that stays at most lookahead
+    items ahead of the workers; an exception from the iterator is kept in error.
+    """
+
+    def __init__(self, iterator, lookahead=64):
+        self.items = collections.deque()
+        self.lookahead = lookahead
+        self.finished = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.feeder = threading.Thread(target=self._feed, args=(iterator,), name="work-feeder", daemon=True)
+        self.feeder.start()
+
+    def _feed(self, iterator):
+        try:
+            for item in iterator:
+                with self.condition:
+                    while len(self.items) >= self.lookahead:
+                        self.condition.wait()
+                    self.items.append(item)
+                    self.condition.notify_all()
+        except Exception as e:
+            logging.error(f"Error producing work items: {str(e)}")
+            self.error = e
+        finally:
+            with self.condition:
+                self.finished = True
+                self.condition.notify_all()
+
+    def get(self, worker_id):
+        with self.condition:
+            while not self.items and not self.finished:
+                self.condition.wait()
+            if not self.items:
+                return None
+            self.condition.notify_all()
+            return self.items.popleft()
+
+    def __len__(self):
+        with self.condition:
+            return len(self.items)
+
+
+def run_work_queue(items, handle, max_workers, work_stealing=False, adaptive=False, lookahead=64):
+    """
+    Runs handle(item) for every item (a list or an iterator) on up to
+    max_workers threads; handle returns a truthy value on success.
+    """
+    if isinstance(items, (list, tuple)):
+        if not items:
+            return
+        worker_count = max(1, min(max_workers, len(items)))
+        work = WorkQueue(items, worker_count, work_stealing)
+    else:
+        worker_count = max(1, max_workers)
+        work = StreamingWorkQueue(iter(items), lookahead)
+    limit = AdaptiveLimit(max(1, worker_count // 2), maximum=worker_count) if adaptive else None
+
+    def worker(worker_id):
+        while True:
+            if limit is not None:
+                limit.acquire()
+            item = work.get(worker_id)
+            if item is None:
+                if limit is not None:
+                    limit.release()
+                return
+            start = time.monotonic()
+            ok = False
+            try:
+                ok = bool(handle(item))
+            except Exception as e:
+                logging.error(f"Worker error: {str(e)}")
+            finally:
+                if limit is not None:
+                    limit.release(time.monotonic() - start, ok)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=worker_count) as executor:
+        for future in [executor.submit(worker, i) for i in range(worker_count)]:
+            future.result()
+
+    if getattr(work, "error", None) is not None:
+        raise work.error